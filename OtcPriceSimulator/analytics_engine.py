@@ -5,8 +5,140 @@ from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import io
 import base64
+import time
+from dataclasses import dataclass, fields
 from technical_indicators import TechnicalAnalyzer
 
+# Threshold tables for bucketing market snapshots (values equal to an edge fall in the lower bucket)
+_COND_EDGES = np.array([-5.0, -1.0, 1.0, 5.0])
+_COND_LABELS = ('Strong Bearish', 'Bearish', 'Neutral', 'Bullish', 'Strong Bullish')
+_VOL_EDGES = np.array([5e8, 1e9])
+_VOL_LABELS = ('Low', 'Medium', 'High')
+_VOLATILITY_EDGES = np.array([2.0, 5.0])
+_VOLATILITY_LABELS = ('Low', 'Medium', 'High')
+
+# Overall risk and position size indexed by the number of risk factors (capped at 2)
+_RISK_BY_COUNT = ('Low', 'Medium', 'High')
+_POSITION_SIZE_BY_COUNT = ('Normal', 'Medium', 'Small')
+
+# Arbitrage score bins (a score equal to an edge falls in the lower bin)
+_SCORE_EDGES = np.array([20.0, 40.0, 60.0, 80.0])
+_SCORE_RECOMMENDATIONS = np.array([
+    'Poor opportunity',
+    'Low opportunity',
+    'Moderate opportunity',
+    'Good arbitrage opportunity',
+    'Excellent arbitrage opportunity'
+], dtype=object)
+_SCORE_ACTIONS = np.array([
+    'Avoid execution',
+    'Wait for better spreads',
+    'Monitor for better conditions',
+    'Consider execution',
+    'Execute immediately'
+], dtype=object)
+_RISK_EDGES = np.array([30.0, 60.0])
+_RISK_LABELS = np.array(['High', 'Medium', 'Low'], dtype=object)
+
+@dataclass(slots=True, frozen=True)
+class ArbitrageScore:
+    """Result of scoring a single arbitrage opportunity"""
+    score: float
+    spread_pct: float
+    price_impact_pct: float
+    net_arbitrage_pct: float
+    recommendation: str
+    action: str
+    risk_level: str
+
+# Field names in declaration order, for flat dict conversion without asdict's recursive deep copy
+_ARBITRAGE_SCORE_FIELDS = tuple(f.name for f in fields(ArbitrageScore))
+
+def _score_core(otc_price: float, jupiter_price: float, is_buy: bool,
+                volume: float, price_impact: float) -> Tuple[float, float, float]:
+    """
+    Core arbitrage score arithmetic, kept free of I/O and dict building
+    
+    Returns:
+        Tuple of (final_score, spread_pct, net_arbitrage_pct)
+    """
+    # Calculate spread percentage
+    if is_buy:
+        spread_pct = ((otc_price - jupiter_price) / jupiter_price) * 100
+    else:  # SELL
+        spread_pct = ((jupiter_price - otc_price) / jupiter_price) * 100
+    
+    # Calculate net arbitrage after price impact
+    net_arbitrage = spread_pct - price_impact
+    
+    # A missing price or impact (NaN/inf) scores 0 rather than slipping through min/max as 100
+    if not np.isfinite(net_arbitrage):
+        return 0.0, spread_pct, net_arbitrage
+    
+    # Score calculation (0-100)
+    base_score = max(0, min(100, (net_arbitrage + 5) * 10))  # Scale to 0-100
+    
+    # Adjust score based on volume and market conditions
+    volume_factor = 1.0
+    if volume > 10:  # Large orders have higher execution risk
+        volume_factor = 0.8
+    elif volume < 1:  # Small orders have lower impact
+        volume_factor = 1.1
+    
+    return base_score * volume_factor, spread_pct, net_arbitrage
+
+def _performance_kernel(spread: np.ndarray, amount: np.ndarray, usdc: np.ndarray,
+                        arb: np.ndarray) -> Tuple:
+    """
+    Reduce the match log columns to the trading performance scalars
+    
+    Args:
+        spread: Buy/sell spread per match
+        amount: Matched SOL amount per match
+        usdc: Matched USDC total per match
+        arb: OTC vs Jupiter spread per match (NaN when unknown)
+        
+    Returns:
+        Tuple of (total_sol, total_usdc, avg_spread, volume_weighted_spread,
+        profitable_count, best_spread, worst_spread, arb_count,
+        profitable_arb_count, avg_arb_spread, best_arb_spread)
+    """
+    total_sol = amount.sum()
+    volume_weighted = np.vdot(spread, amount) / total_sol if total_sol else 0.0
+    
+    arb = arb[~np.isnan(arb)]
+    if arb.size:
+        arb_stats = (arb.size, int((arb > 0).sum()), arb.mean(), arb.max())
+    else:
+        arb_stats = (0, 0, np.nan, np.nan)
+    
+    return (total_sol, usdc.sum(), spread.mean(), volume_weighted,
+            int((spread > 0).sum()), spread.max(), spread.min()) + arb_stats
+
+def _pricing_adjustment(volatility: float, price_impact: float) -> float:
+    """Premium/discount in percent: 0.5% base, widened by volatility and execution impact"""
+    return 0.5 + volatility * 0.1 + price_impact * 0.5
+
+def _build_buy_price(jupiter_price: float, volatility: float,
+                     price_impact: float) -> Tuple[float, float, float, str]:
+    """Buy offers pay a premium to attract sellers"""
+    premium = _pricing_adjustment(volatility, price_impact)
+    suggested = jupiter_price * (1 + premium / 100)
+    # Conservative adds a further 0.5% premium, aggressive trims 0.2%
+    return (suggested, suggested * 1.005, suggested * 0.998,
+            f"Offer {premium:.2f}% premium to attract sellers")
+
+def _build_sell_price(jupiter_price: float, volatility: float,
+                      price_impact: float) -> Tuple[float, float, float, str]:
+    """Sell offers give a discount to attract buyers"""
+    discount = _pricing_adjustment(volatility, price_impact)
+    suggested = jupiter_price * (1 - discount / 100)
+    # Conservative adds a further 0.5% discount, aggressive trims 0.2%
+    return (suggested, suggested * 0.995, suggested * 0.998,
+            f"Offer {discount:.2f}% discount to attract buyers")
+
+_PRICE_BUILDERS = {'BUY': _build_buy_price, 'SELL': _build_sell_price}
+
 class AnalyticsEngine:
     """Advanced analytics engine for OTC trading and market analysis"""
     
@@ -14,6 +146,34 @@ class AnalyticsEngine:
         self.csv_logger = csv_logger
         self.jupiter_api = jupiter_api
         self.technical_analyzer = TechnicalAnalyzer()
+        self._quote_cache = {}  # Rounded volume -> (fetched_at, quote)
+        self._hist_cache = {}  # CSV file signature -> historical analysis
+    
+    def _cached_quote(self, volume: float, ttl: float = 2.0) -> Optional[Dict]:
+        """
+        Get an advanced Jupiter quote, reusing a recent one for the same volume
+        
+        Args:
+            volume: Trade volume in SOL
+            ttl: Seconds a cached quote stays valid
+            
+        Returns:
+            Quote data or None if the request failed
+        """
+        key = round(volume, 4)
+        now = time.time()
+        
+        cached = self._quote_cache.get(key)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        
+        quote = self.jupiter_api.get_advanced_quote_with_routes(volume)
+        if quote:
+            # Drop expired entries so the cache stays bounded
+            self._quote_cache = {k: v for k, v in self._quote_cache.items() if now - v[0] < ttl}
+            self._quote_cache[key] = (now, quote)
+        
+        return quote
     
     def analyze_price_impact_curve(self, amounts: List[float]) -> Dict:
         """
@@ -27,36 +187,36 @@ class AnalyticsEngine:
         """
         impact_data = self.jupiter_api.get_price_impact_analysis(amounts)
         
-        if not impact_data or all(v is None for v in impact_data.values()):
-            return {
-                'error': 'Unable to fetch price impact data',
-                'recommendation': 'Use smaller order sizes'
-            }
-        
         # Filter out None values
-        valid_data = {k: v for k, v in impact_data.items() if v is not None}
+        valid_data = {k: v for k, v in impact_data.items() if v is not None} if impact_data else {}
         
         if not valid_data:
             return {
-                'error': 'No valid price impact data',
+                'error': 'Unable to fetch price impact data',
                 'recommendation': 'Use smaller order sizes'
             }
         
+        amt = np.fromiter(valid_data.keys(), dtype=np.float64, count=len(valid_data))
+        imp = np.fromiter(valid_data.values(), dtype=np.float64, count=len(valid_data))
+        
         # Find optimal order size (minimize price impact while maximizing size)
         impact_threshold = 0.5  # 0.5% impact threshold
-        optimal_sizes = [amount for amount, impact in valid_data.items() 
-                        if impact <= impact_threshold]
+        optimal_mask = imp <= impact_threshold
+        
+        recommended_size = float(amt[optimal_mask].max()) if optimal_mask.any() else float(amt.min())
         
-        recommended_size = max(optimal_sizes) if optimal_sizes else min(valid_data.keys())
+        low_mask = imp <= 0.1
+        high_mask = imp > 0.5
+        medium_mask = (imp > 0.1) & ~high_mask
         
         return {
             'impact_data': valid_data,
             'recommended_size': recommended_size,
             'impact_threshold': impact_threshold,
             'analysis': {
-                'low_impact_range': [k for k, v in valid_data.items() if v <= 0.1],
-                'medium_impact_range': [k for k, v in valid_data.items() if 0.1 < v <= 0.5],
-                'high_impact_range': [k for k, v in valid_data.items() if v > 0.5]
+                'low_impact_range': amt[low_mask].tolist(),
+                'medium_impact_range': amt[medium_mask].tolist(),
+                'high_impact_range': amt[high_mask].tolist()
             }
         }
     
@@ -68,8 +228,16 @@ class AnalyticsEngine:
             Performance metrics and insights
         """
         try:
-            matches_df = self.csv_logger.get_recent_matches(limit=1000)
-            prices_df = self.csv_logger.get_recent_price_logs(limit=1000)
+            # Reuse the previous analysis while the CSV logs are unchanged
+            signature = self.csv_logger.get_file_signature()
+            if signature in self._hist_cache:
+                return self._hist_cache[signature]
+            
+            matches_df = self.csv_logger.get_recent_matches(
+                limit=1000,
+                columns=['match_amount', 'total_usdc', 'spread', 'otc_vs_jupiter_spread']
+            )
+            prices_df = self.csv_logger.get_recent_price_logs(limit=1000, columns=['jupiter_price'])
             
             if matches_df.empty and prices_df.empty:
                 return {
@@ -81,29 +249,27 @@ class AnalyticsEngine:
             
             # Price analysis
             if not prices_df.empty:
-                prices_df['timestamp'] = pd.to_datetime(prices_df['timestamp'])
-                prices_df = prices_df.sort_values('timestamp')
-                
                 price_series = pd.Series(
-                    prices_df['jupiter_price'].values,
-                    index=prices_df['timestamp']
-                )
+                    prices_df['jupiter_price'].to_numpy(),
+                    index=prices_df['timestamp'].to_numpy()
+                ).sort_index()
                 
                 # Technical indicators
                 analysis['technical'] = {
-                    'rsi': self.technical_analyzer.calculate_rsi(price_series).iloc[-1] if len(price_series) > 14 else 50,
+                    'rsi': self.technical_analyzer.calculate_rsi_last(price_series.to_numpy()),
                     'volatility': self.technical_analyzer.calculate_volatility(price_series),
-                    'momentum': self.technical_analyzer.calculate_momentum(price_series),
+                    'momentum': self.technical_analyzer.calculate_price_momentum(price_series),
                     'support_resistance': self.technical_analyzer.calculate_support_resistance(price_series),
                     'trading_signal': self.technical_analyzer.generate_trading_signals(price_series)
                 }
                 
                 # Price statistics
+                tail_24h = price_series.to_numpy()[-24:]
                 analysis['price_stats'] = {
                     'current_price': price_series.iloc[-1],
                     'price_range_24h': {
-                        'high': price_series.tail(24).max() if len(price_series) >= 24 else price_series.max(),
-                        'low': price_series.tail(24).min() if len(price_series) >= 24 else price_series.min()
+                        'high': np.nanmax(tail_24h),
+                        'low': np.nanmin(tail_24h)
                     },
                     'average_price': price_series.mean(),
                     'price_trend': 'Bullish' if price_series.iloc[-1] > price_series.mean() else 'Bearish'
@@ -111,30 +277,38 @@ class AnalyticsEngine:
             
             # Trading performance analysis
             if not matches_df.empty:
-                matches_df['timestamp'] = pd.to_datetime(matches_df['timestamp'])
+                columns = [
+                    matches_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                    if col in matches_df.columns else np.empty(0)
+                    for col in ('spread', 'match_amount', 'total_usdc', 'otc_vs_jupiter_spread')
+                ]
+                (total_volume_sol, total_volume_usdc, average_spread, volume_weighted_spread,
+                 n_pos, best_spread, worst_spread, n_arb, n_arb_pos, average_arb,
+                 best_arb) = _performance_kernel(*columns)
                 
                 analysis['trading_performance'] = {
                     'total_matches': len(matches_df),
-                    'total_volume_sol': matches_df['match_amount'].sum(),
-                    'total_volume_usdc': matches_df['total_usdc'].sum(),
-                    'average_spread': matches_df['spread'].mean(),
-                    'profitable_trades': len(matches_df[matches_df['spread'] > 0]),
-                    'win_rate': len(matches_df[matches_df['spread'] > 0]) / len(matches_df) * 100,
-                    'best_spread': matches_df['spread'].max(),
-                    'worst_spread': matches_df['spread'].min()
+                    'total_volume_sol': total_volume_sol,
+                    'total_volume_usdc': total_volume_usdc,
+                    'average_spread': average_spread,
+                    'volume_weighted_spread': volume_weighted_spread,
+                    'profitable_trades': n_pos,
+                    'win_rate': n_pos / len(matches_df) * 100,
+                    'best_spread': best_spread,
+                    'worst_spread': worst_spread
                 }
                 
                 # Arbitrage opportunities
-                if 'otc_vs_jupiter_spread' in matches_df.columns:
-                    arbitrage_data = matches_df['otc_vs_jupiter_spread'].dropna()
-                    if not arbitrage_data.empty:
-                        analysis['arbitrage_analysis'] = {
-                            'total_arbitrage_opportunities': len(arbitrage_data),
-                            'profitable_arbitrage': len(arbitrage_data[arbitrage_data > 0]),
-                            'average_arbitrage_spread': arbitrage_data.mean(),
-                            'best_arbitrage_opportunity': arbitrage_data.max()
-                        }
+                if n_arb:
+                    analysis['arbitrage_analysis'] = {
+                        'total_arbitrage_opportunities': n_arb,
+                        'profitable_arbitrage': n_arb_pos,
+                        'average_arbitrage_spread': average_arb,
+                        'best_arbitrage_opportunity': best_arb
+                    }
             
+            # Only the latest signature can be hit again, so keep a single entry
+            self._hist_cache = {signature: analysis}
             return analysis
             
         except Exception as e:
@@ -153,91 +327,75 @@ class AnalyticsEngine:
         Returns:
             Market insights and recommendations
         """
-        insights = {
-            'market_conditions': {},
-            'trading_recommendations': {},
-            'risk_assessment': {}
-        }
-        
-        if not market_data:
+        if not market_data or 'solana' not in market_data:
             return {
                 'error': 'No market data available',
                 'recommendation': 'Refresh market data to generate insights'
             }
         
         # Analyze SOL market conditions
-        if 'solana' in market_data:
-            sol_data = market_data['solana']
-            
-            # Market condition assessment
-            change_24h = sol_data.get('change_24h', 0)
-            volume_24h = sol_data.get('volume_24h', 0)
-            price = sol_data.get('price', 0)
-            
-            if change_24h > 5:
-                market_condition = 'Strong Bullish'
-            elif change_24h > 1:
-                market_condition = 'Bullish'
-            elif change_24h > -1:
-                market_condition = 'Neutral'
-            elif change_24h > -5:
-                market_condition = 'Bearish'
-            else:
-                market_condition = 'Strong Bearish'
-            
-            insights['market_conditions'] = {
+        sol_data = market_data['solana']
+        
+        # Market condition assessment
+        change_24h = sol_data.get('change_24h', 0)
+        volume_24h = sol_data.get('volume_24h', 0)
+        
+        market_condition = _COND_LABELS[np.searchsorted(_COND_EDGES, change_24h)]
+        volume_analysis = _VOL_LABELS[np.searchsorted(_VOL_EDGES, volume_24h)]
+        volatility_level = _VOLATILITY_LABELS[np.searchsorted(_VOLATILITY_EDGES, abs(change_24h))]
+        
+        insights = {
+            'market_conditions': {
                 'sol_condition': market_condition,
                 'price_momentum': change_24h,
-                'volume_analysis': 'High' if volume_24h > 1e9 else 'Medium' if volume_24h > 5e8 else 'Low',
-                'volatility_level': 'High' if abs(change_24h) > 5 else 'Medium' if abs(change_24h) > 2 else 'Low'
+                'volume_analysis': volume_analysis,
+                'volatility_level': volatility_level
             }
-            
-            # Trading recommendations based on conditions
-            if market_condition in ['Strong Bullish', 'Bullish']:
-                insights['trading_recommendations'] = {
-                    'bias': 'Buy-side favorable',
-                    'strategy': 'Consider buy offers at slight discount to capture upside',
-                    'risk_level': 'Medium',
-                    'optimal_timeframe': 'Short to medium term'
-                }
-            elif market_condition in ['Strong Bearish', 'Bearish']:
-                insights['trading_recommendations'] = {
-                    'bias': 'Sell-side favorable',
-                    'strategy': 'Consider sell offers at premium or wait for better entry',
-                    'risk_level': 'High',
-                    'optimal_timeframe': 'Wait for reversal signals'
-                }
-            else:
-                insights['trading_recommendations'] = {
-                    'bias': 'Neutral - Range trading',
-                    'strategy': 'Focus on spread capture, both buy and sell opportunities',
-                    'risk_level': 'Low to Medium',
-                    'optimal_timeframe': 'Flexible'
-                }
+        }
         
-        # Risk assessment
-        volatility_level = insights['market_conditions'].get('volatility_level', 'Medium')
+        # Trading recommendations based on conditions
+        if market_condition in ['Strong Bullish', 'Bullish']:
+            insights['trading_recommendations'] = {
+                'bias': 'Buy-side favorable',
+                'strategy': 'Consider buy offers at slight discount to capture upside',
+                'risk_level': 'Medium',
+                'optimal_timeframe': 'Short to medium term'
+            }
+        elif market_condition in ['Strong Bearish', 'Bearish']:
+            insights['trading_recommendations'] = {
+                'bias': 'Sell-side favorable',
+                'strategy': 'Consider sell offers at premium or wait for better entry',
+                'risk_level': 'High',
+                'optimal_timeframe': 'Wait for reversal signals'
+            }
+        else:
+            insights['trading_recommendations'] = {
+                'bias': 'Neutral - Range trading',
+                'strategy': 'Focus on spread capture, both buy and sell opportunities',
+                'risk_level': 'Low to Medium',
+                'optimal_timeframe': 'Flexible'
+            }
         
+        # Risk assessment
         risk_factors = []
         if volatility_level == 'High':
             risk_factors.append('High price volatility increases execution risk')
-        
-        volume_analysis = insights['market_conditions'].get('volume_analysis', 'Medium')
         if volume_analysis == 'Low':
             risk_factors.append('Low volume may impact liquidity')
         
+        risk_count = min(len(risk_factors), 2)
         insights['risk_assessment'] = {
-            'overall_risk': 'High' if len(risk_factors) > 1 else 'Medium' if risk_factors else 'Low',
+            'overall_risk': _RISK_BY_COUNT[risk_count],
             'risk_factors': risk_factors,
-            'recommended_position_size': 'Small' if len(risk_factors) > 1 else 'Medium' if risk_factors else 'Normal'
+            'recommended_position_size': _POSITION_SIZE_BY_COUNT[risk_count]
         }
         
         return insights
     
-    def calculate_arbitrage_score(self, otc_price: float, jupiter_price: float, 
-                                offer_type: str, volume: float) -> Dict:
+    def score_arbitrage(self, otc_price: float, jupiter_price: float, 
+                        offer_type: str, volume: float) -> ArbitrageScore:
         """
-        Calculate comprehensive arbitrage opportunity score
+        Score an arbitrage opportunity without building a result dict
         
         Args:
             otc_price: OTC offer price
@@ -246,59 +404,89 @@ class AnalyticsEngine:
             volume: Trade volume
             
         Returns:
-            Arbitrage analysis with score and recommendations
+            ArbitrageScore with score and recommendations
         """
-        # Calculate spread percentage
-        if offer_type == 'BUY':
-            spread_pct = ((otc_price - jupiter_price) / jupiter_price) * 100
-        else:  # SELL
-            spread_pct = ((jupiter_price - otc_price) / jupiter_price) * 100
-        
         # Get price impact for the volume
-        advanced_quote = self.jupiter_api.get_advanced_quote_with_routes(volume)
+        advanced_quote = self._cached_quote(volume)
         price_impact = advanced_quote.get('price_impact_pct', 0) if advanced_quote else 0
         
-        # Calculate net arbitrage after price impact
-        net_arbitrage = spread_pct - price_impact
+        final_score, spread_pct, net_arbitrage = _score_core(
+            otc_price, jupiter_price, offer_type == 'BUY', volume, price_impact
+        )
         
-        # Score calculation (0-100)
-        base_score = max(0, min(100, (net_arbitrage + 5) * 10))  # Scale to 0-100
+        # Generate recommendation
+        score_bin = int(np.searchsorted(_SCORE_EDGES, final_score))
+        
+        return ArbitrageScore(
+            score=round(final_score, 2),
+            spread_pct=round(spread_pct, 4),
+            price_impact_pct=round(price_impact, 4),
+            net_arbitrage_pct=round(net_arbitrage, 4),
+            recommendation=_SCORE_RECOMMENDATIONS[score_bin],
+            action=_SCORE_ACTIONS[score_bin],
+            risk_level=_RISK_LABELS[np.searchsorted(_RISK_EDGES, final_score)]
+        )
+    
+    def calculate_arbitrage_score(self, otc_price: float, jupiter_price: float, 
+                                offer_type: str, volume: float) -> Dict:
+        """
+        Calculate comprehensive arbitrage opportunity score
+        
+        Args:
+            otc_price: OTC offer price
+            jupiter_price: Current Jupiter price
+            offer_type: 'BUY' or 'SELL'
+            volume: Trade volume
+            
+        Returns:
+            Arbitrage analysis with score and recommendations
+        """
+        score = self.score_arbitrage(otc_price, jupiter_price, offer_type, volume)
+        return {name: getattr(score, name) for name in _ARBITRAGE_SCORE_FIELDS}
+    
+    def calculate_arbitrage_scores_batch(self, otc_prices: np.ndarray, jupiter_prices: np.ndarray,
+                                         is_buy_mask: np.ndarray, volumes: np.ndarray,
+                                         impacts: np.ndarray) -> pd.DataFrame:
+        """
+        Score many arbitrage opportunities at once
         
-        # Adjust score based on volume and market conditions
-        volume_factor = 1.0
-        if volume > 10:  # Large orders have higher execution risk
-            volume_factor = 0.8
-        elif volume < 1:  # Small orders have lower impact
-            volume_factor = 1.1
+        Unlike calculate_arbitrage_score this does not fetch quotes; price
+        impacts must be supplied by the caller.
         
+        Args:
+            otc_prices: OTC offer prices
+            jupiter_prices: Jupiter reference prices (scalar or per offer)
+            is_buy_mask: True for BUY offers, False for SELL offers
+            volumes: Trade volumes
+            impacts: Price impact percentages for each volume
+            
+        Returns:
+            DataFrame with one row per offer and the same fields as calculate_arbitrage_score
+        """
+        otc = np.asarray(otc_prices, dtype=np.float64)
+        jup = np.asarray(jupiter_prices, dtype=np.float64)
+        is_buy = np.asarray(is_buy_mask, dtype=bool)
+        vol = np.asarray(volumes, dtype=np.float64)
+        impact = np.asarray(impacts, dtype=np.float64)
+        
+        spread_pct = np.where(is_buy, otc - jup, jup - otc) / jup * 100
+        net_arbitrage = spread_pct - impact
+        # Non-finite inputs score 0 (lowest bin) as in _score_core; searchsorted would put NaN in the top bin
+        base_score = np.where(np.isfinite(net_arbitrage), np.clip((net_arbitrage + 5) * 10, 0, 100), 0.0)
+        volume_factor = np.where(vol > 10, 0.8, np.where(vol < 1, 1.1, 1.0))
         final_score = base_score * volume_factor
         
-        # Generate recommendation
-        if final_score > 80:
-            recommendation = 'Excellent arbitrage opportunity'
-            action = 'Execute immediately'
-        elif final_score > 60:
-            recommendation = 'Good arbitrage opportunity'
-            action = 'Consider execution'
-        elif final_score > 40:
-            recommendation = 'Moderate opportunity'
-            action = 'Monitor for better conditions'
-        elif final_score > 20:
-            recommendation = 'Low opportunity'
-            action = 'Wait for better spreads'
-        else:
-            recommendation = 'Poor opportunity'
-            action = 'Avoid execution'
-        
-        return {
-            'score': round(final_score, 2),
-            'spread_pct': round(spread_pct, 4),
-            'price_impact_pct': round(price_impact, 4),
-            'net_arbitrage_pct': round(net_arbitrage, 4),
-            'recommendation': recommendation,
-            'action': action,
-            'risk_level': 'Low' if final_score > 60 else 'Medium' if final_score > 30 else 'High'
-        }
+        score_bin = np.searchsorted(_SCORE_EDGES, final_score)
+        
+        return pd.DataFrame({
+            'score': np.round(final_score, 2),
+            'spread_pct': np.round(spread_pct, 4),
+            'price_impact_pct': np.round(np.broadcast_to(impact, final_score.shape), 4),
+            'net_arbitrage_pct': np.round(net_arbitrage, 4),
+            'recommendation': _SCORE_RECOMMENDATIONS[score_bin],
+            'action': _SCORE_ACTIONS[score_bin],
+            'risk_level': _RISK_LABELS[np.searchsorted(_RISK_EDGES, final_score)]
+        })
     
     def generate_optimal_pricing_suggestion(self, market_data: Dict, 
                                           order_type: str, volume: float) -> Dict:
@@ -320,7 +508,7 @@ class AnalyticsEngine:
             }
         
         # Get current Jupiter price with volume consideration
-        advanced_quote = self.jupiter_api.get_advanced_quote_with_routes(volume)
+        advanced_quote = self._cached_quote(volume)
         if not advanced_quote:
             return {
                 'error': 'Unable to fetch Jupiter quote for volume analysis',
@@ -334,39 +522,10 @@ class AnalyticsEngine:
         sol_data = market_data['solana']
         volatility = abs(sol_data.get('change_24h', 0))
         
-        # Calculate suggested pricing based on market conditions
-        if order_type == 'BUY':
-            # For buy offers, offer premium to attract sellers
-            base_premium = 0.5  # 0.5% base premium
-            volatility_adjustment = volatility * 0.1  # Higher volatility = higher premium
-            impact_adjustment = price_impact * 0.5  # Account for execution impact
-            
-            suggested_premium = base_premium + volatility_adjustment + impact_adjustment
-            suggested_price = jupiter_price * (1 + suggested_premium / 100)
-            
-            strategy = f"Offer {suggested_premium:.2f}% premium to attract sellers"
-            
-        else:  # SELL
-            # For sell offers, offer discount to attract buyers
-            base_discount = 0.5  # 0.5% base discount
-            volatility_adjustment = volatility * 0.1
-            impact_adjustment = price_impact * 0.5
-            
-            suggested_discount = base_discount + volatility_adjustment + impact_adjustment
-            suggested_price = jupiter_price * (1 - suggested_discount / 100)
-            
-            strategy = f"Offer {suggested_discount:.2f}% discount to attract buyers"
-        
-        # Risk-adjusted alternatives
-        conservative_adjustment = 0.5  # Additional 0.5% buffer
-        aggressive_adjustment = -0.2   # Reduce buffer by 0.2%
-        
-        if order_type == 'BUY':
-            conservative_price = suggested_price * (1 + conservative_adjustment / 100)
-            aggressive_price = suggested_price * (1 + aggressive_adjustment / 100)
-        else:
-            conservative_price = suggested_price * (1 - conservative_adjustment / 100)
-            aggressive_price = suggested_price * (1 + aggressive_adjustment / 100)
+        build_prices = _PRICE_BUILDERS.get(order_type, _build_sell_price)
+        suggested_price, conservative_price, aggressive_price, strategy = build_prices(
+            jupiter_price, volatility, price_impact
+        )
         
         return {
             'suggested_price': round(suggested_price, 4),
@@ -1,64 +1,192 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import time
-import threading
-from datetime import datetime, timedelta
 import os
-from jupiter_api import JupiterAPI
-from otc_pool import OTCPool
-from csv_logger import CSVLogger
-from price_monitor import PriceMonitor
+import time
+from datetime import datetime
+
+# Sidebar theme palettes, in selectbox order
+THEME_COLORS = {
+    "Dark Green": {"primary": "#00ff88", "bg": "#0e1117", "secondary": "#262730"},
+    "Dark Blue": {"primary": "#1f77b4", "bg": "#0e1117", "secondary": "#262730"},
+    "Purple": {"primary": "#9467bd", "bg": "#0e1117", "secondary": "#262730"},
+    "Orange": {"primary": "#ff7f0e", "bg": "#0e1117", "secondary": "#262730"},
+    "Red": {"primary": "#d62728", "bg": "#0e1117", "secondary": "#262730"},
+    "Light Mode": {"primary": "#ff4b4b", "bg": "#ffffff", "secondary": "#f0f2f6"}
+}
+
+# Offer status bins: spread > 5 Excellent, > 1 Good, > -1 Fair, else Poor
+_SPREAD_EDGES = np.array([-1.0, 1.0, 5.0])
+_SPREAD_STATUS = np.array(["🔴 Poor", "⚪ Fair", "🟡 Good", "🟢 Excellent"], dtype=object)
+
+# Process-wide singletons; client modules are imported inside the factories so they load once
+@st.cache_resource
+def get_jupiter_api():
+    from jupiter_api import JupiterAPI
+    return JupiterAPI()
+
+@st.cache_resource
+def get_otc_pool():
+    from otc_pool import OTCPool
+    return OTCPool()
 
-# Initialize components
 @st.cache_resource
+def get_csv_logger():
+    from csv_logger import CSVLogger
+    return CSVLogger()
+
+@st.cache_resource
+def get_price_monitor():
+    from price_monitor import PriceMonitor
+    return PriceMonitor(get_jupiter_api(), get_otc_pool(), get_csv_logger())
+
+@st.cache_resource
+def get_technical_analyzer():
+    from technical_indicators import TechnicalAnalyzer
+    return TechnicalAnalyzer()
+
+# Initialize components
 def init_components():
-    jupiter_api = JupiterAPI()
-    otc_pool = OTCPool()
-    csv_logger = CSVLogger()
-    price_monitor = PriceMonitor(jupiter_api, otc_pool, csv_logger)
-    return jupiter_api, otc_pool, csv_logger, price_monitor
+    return get_jupiter_api(), get_otc_pool(), get_csv_logger(), get_price_monitor(), get_technical_analyzer()
 
-def main():
-    st.set_page_config(
-        page_title="OTC Trading Pool Simulator",
-        page_icon="💱",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
+@st.cache_data(ttl=30, show_spinner=False)
+def load_recent_price_logs(_csv_logger, limit: int, file_signature: tuple) -> pd.DataFrame:
+    """Recent price logs sorted oldest first; file_signature invalidates the cache on new rows"""
+    df = _csv_logger.get_recent_price_logs(limit=limit)
+    if not df.empty:
+        df = df.iloc[::-1]  # Logs come back newest first
+    return df
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_active_offers(_otc_pool, version: int) -> list:
+    """Active offers for one pool revision; version invalidates the cache on changes"""
+    return _otc_pool.get_active_offers()
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_active_offers_frame(_otc_pool, version: int) -> pd.DataFrame:
+    """Active offers as a DataFrame for one pool revision"""
+    return pd.DataFrame(load_active_offers(_otc_pool, version))
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_cancel_options(_otc_pool, version: int) -> dict:
+    """Cancel selectbox labels keyed by offer ID for one pool revision"""
+    return {
+        o['id']: f"#{o['id']} - {o['type']} {o['sol_amount']} SOL @ ${o['price_per_sol']}"
+        for o in load_active_offers(_otc_pool, version)
+    }
+
+def store_market_data(market_data: dict) -> bool:
+    """
+    Publish a market data snapshot to session state if it is newer than the current one
     
-    st.title("💱 OTC Trading Pool Simulator")
-    st.markdown("### SOL → USDC Private Pool vs Jupiter DEX")
+    Args:
+        market_data: Result of JupiterAPI.get_market_data
+        
+    Returns:
+        True if market data is available
+    """
+    if not market_data:
+        return False
     
-    # Initialize components
-    jupiter_api, otc_pool, csv_logger, price_monitor = init_components()
+    current = st.session_state.get('market_data') or {}
+    if market_data.get('timestamp', 0) > current.get('timestamp', 0):
+        st.session_state.market_data = market_data
+        st.session_state.last_market_update = datetime.now()
+        st.session_state.last_market_update_mono = time.monotonic()
+    return True
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def render_market_panels(_market_data: dict, data_timestamp: float) -> tuple:
+    """
+    Pre-render the market panel HTML for one market data snapshot
     
-    # Real-time market data section
-    st.header("📊 Live Market Data")
+    Args:
+        _market_data: Market data from JupiterAPI.get_market_data (not hashed)
+        data_timestamp: Fetch time of the snapshot, used as the cache key
+        
+    Returns:
+        Tuple of (sol_html, usdc_html, performance_rows, market_status); entries are None/empty
+        when data is missing
+    """
+    sol_html = usdc_html = market_status = None
+    performance_rows = ()
     
+    sol_data = _market_data.get('solana')
+    if sol_data:
+        sol_html = f"""
+            <div style='background-color: rgba(255,255,255,0.1); padding: 10px; border-radius: 5px; margin: 5px 0;'>
+                <strong>Market Cap:</strong> ${sol_data['market_cap']:,.0f}<br>
+                <strong>24h Volume:</strong> ${sol_data['volume_24h']:,.0f}<br>
+                <strong>Rank:</strong> #{sol_data['market_cap_rank']}<br>
+                <strong>Supply:</strong> {sol_data['circulating_supply']:,.0f} SOL
+            </div>
+            """
+        
+        # Performance metrics with visual indicators
+        changes = [
+            ("1h", sol_data.get('change_1h', 0)),
+            ("24h", sol_data.get('change_24h', 0)),
+            ("7d", sol_data.get('change_7d', 0))
+        ]
+        rows = []
+        for period, change in changes:
+            color = "#00ff88" if change >= 0 else "#ff4444"
+            icon = "▲" if change >= 0 else "▼"
+            rows.append(f"""
+                <div style='display: flex; justify-content: space-between; padding: 5px; margin: 2px 0; background-color: rgba(255,255,255,0.05); border-radius: 3px;'>
+                    <span><strong>SOL {period}:</strong></span>
+                    <span style='color: {color}'>{icon} {change:+.2f}%</span>
+                </div>
+                """)
+        performance_rows = tuple(rows)
+        
+        # Market status from the mean 1h/24h/7d change
+        overall_trend = np.mean([change for _, change in changes])
+        market_status = np.select(
+            [overall_trend > 1, overall_trend > -1],
+            ["🟢 Bullish", "🟡 Neutral"],
+            default="🔴 Bearish"
+        ).item()
+    
+    usdc_data = _market_data.get('usdc')
+    if usdc_data:
+        usdc_html = f"""
+            <div style='background-color: rgba(255,255,255,0.1); padding: 10px; border-radius: 5px; margin: 5px 0;'>
+                <strong>Market Cap:</strong> ${usdc_data['market_cap']:,.0f}<br>
+                <strong>24h Volume:</strong> ${usdc_data['volume_24h']:,.0f}<br>
+                <strong>Rank:</strong> #{usdc_data['market_cap_rank']}<br>
+                <strong>Supply:</strong> {usdc_data['circulating_supply']:,.0f} USDC
+            </div>
+            """
+    
+    return sol_html, usdc_html, performance_rows, market_status
+
+@st.fragment
+def render_market_data(jupiter_api):
+    """Live SOL/USDC market data panels"""
     # Fetch and display live market data
     col1, col2, col3 = st.columns(3)
     
-    # Auto-refresh market data when monitoring is active
+    # Auto-refresh market data when monitoring is active; the shared JupiterAPI memo
+    # collapses repeated calls inside its 60 second market_ttl into one request
     if st.session_state.get('monitoring_active', False):
-        # Only refresh if it's been more than 60 seconds since last update
-        if (not st.session_state.get('last_market_update') or 
-            (datetime.now() - st.session_state.last_market_update).seconds > 60):
-            market_data = jupiter_api.get_market_data()
-            if market_data:
-                st.session_state.market_data = market_data
-                st.session_state.last_market_update = datetime.now()
+        store_market_data(jupiter_api.get_market_data())
     
     with col1:
         if st.button("🔄 Refresh Market Data"):
-            market_data = jupiter_api.get_market_data()
-            if market_data:
-                st.session_state.market_data = market_data
-                st.session_state.last_market_update = datetime.now()
+            if store_market_data(jupiter_api.get_market_data(max_age=0)):
                 st.success("Market data updated!")
             else:
                 st.error("Failed to fetch market data")
-            st.rerun()
+    
+    # Ages are measured on the monotonic clock; wall-clock datetimes are only kept for display
+    update_age = time.monotonic() - st.session_state.get('last_market_update_mono', float('-inf'))
+    
+    # Market panel HTML only needs re-rendering when a new snapshot arrives
+    if st.session_state.get('market_data'):
+        sol_html, usdc_html, performance_rows, market_status = render_market_panels(
+            st.session_state.market_data, st.session_state.market_data.get('timestamp', 0)
+        )
     
     # Display SOL market data with enhanced styling
     if st.session_state.get('market_data') and 'solana' in st.session_state.market_data:
@@ -80,14 +208,7 @@ def main():
             )
             
             # Additional metrics in compact format
-            st.markdown(f"""
-            <div style='background-color: rgba(255,255,255,0.1); padding: 10px; border-radius: 5px; margin: 5px 0;'>
-                <strong>Market Cap:</strong> ${sol_data['market_cap']:,.0f}<br>
-                <strong>24h Volume:</strong> ${sol_data['volume_24h']:,.0f}<br>
-                <strong>Rank:</strong> #{sol_data['market_cap_rank']}<br>
-                <strong>Supply:</strong> {sol_data['circulating_supply']:,.0f} SOL
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(sol_html, unsafe_allow_html=True)
     
     # Display USDC market data with enhanced styling
     if st.session_state.get('market_data') and 'usdc' in st.session_state.market_data:
@@ -106,286 +227,445 @@ def main():
             )
             
             # USDC specific metrics
-            st.markdown(f"""
-            <div style='background-color: rgba(255,255,255,0.1); padding: 10px; border-radius: 5px; margin: 5px 0;'>
-                <strong>Market Cap:</strong> ${usdc_data['market_cap']:,.0f}<br>
-                <strong>24h Volume:</strong> ${usdc_data['volume_24h']:,.0f}<br>
-                <strong>Rank:</strong> #{usdc_data['market_cap_rank']}<br>
-                <strong>Supply:</strong> {usdc_data['circulating_supply']:,.0f} USDC
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(usdc_html, unsafe_allow_html=True)
     
     # Display additional market metrics with enhanced presentation
     with col3:
         st.subheader("📈 Market Analysis")
         
         if st.session_state.get('market_data') and 'solana' in st.session_state.market_data:
-            sol_data = st.session_state.market_data['solana']
-            
-            # Performance metrics with visual indicators
-            changes = [
-                ("1h", sol_data.get('change_1h', 0)),
-                ("24h", sol_data.get('change_24h', 0)),
-                ("7d", sol_data.get('change_7d', 0))
-            ]
-            
             # Create a performance dashboard
-            for period, change in changes:
-                color = "#00ff88" if change >= 0 else "#ff4444"
-                icon = "▲" if change >= 0 else "▼"
-                st.markdown(f"""
-                <div style='display: flex; justify-content: space-between; padding: 5px; margin: 2px 0; background-color: rgba(255,255,255,0.05); border-radius: 3px;'>
-                    <span><strong>SOL {period}:</strong></span>
-                    <span style='color: {color}'>{icon} {change:+.2f}%</span>
-                </div>
-                """, unsafe_allow_html=True)
+            for row_html in performance_rows:
+                st.markdown(row_html, unsafe_allow_html=True)
             
             # Market status indicator
-            overall_trend = sum([sol_data.get('change_1h', 0), sol_data.get('change_24h', 0), sol_data.get('change_7d', 0)]) / 3
-            if overall_trend > 1:
-                market_status = "🟢 Bullish"
-            elif overall_trend > -1:
-                market_status = "🟡 Neutral"
-            else:
-                market_status = "🔴 Bearish"
-            
             st.markdown(f"**Market Sentiment:** {market_status}")
             
             # Last update with freshness indicator
             if st.session_state.get('last_market_update'):
-                update_age = (datetime.now() - st.session_state.last_market_update).seconds
                 freshness = "🟢 Fresh" if update_age < 60 else "🟡 Stale" if update_age < 300 else "🔴 Old"
                 st.markdown(f"**Data Status:** {freshness}")
                 st.markdown(f"**Last Update:** {st.session_state.last_market_update.strftime('%H:%M:%S')}")
         else:
             st.info("Click 'Refresh Market Data' to load live prices")
+
+@st.fragment
+def render_price_impact_tab(jupiter_api):
+    """Price impact across order sizes"""
+    st.subheader("📊 Price Impact Analysis")
+    col1, col2 = st.columns([2, 1])
     
-    st.divider()
+    with col2:
+        if st.button("🔍 Analyze Price Impact"):
+            with st.spinner("Analyzing price impact across order sizes..."):
+                amounts = [0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0]
+                impact_data = jupiter_api.get_price_impact_analysis(amounts)
+                
+                # Validate once here so reruns can plot the stored arrays directly
+                amounts_arr = np.array(sorted(impact_data or {}), dtype=float)
+                impacts_arr = np.array([impact_data[a] for a in amounts_arr], dtype=float)
+                valid = np.isfinite(amounts_arr) & np.isfinite(impacts_arr)
+                
+                if valid.sum() >= 2:
+                    st.session_state.impact_analysis = (amounts_arr[valid], impacts_arr[valid])
+                    st.success("Analysis complete!")
+                else:
+                    st.error("Unable to fetch price impact data")
     
-    # Advanced Jupiter Analytics Section
-    st.header("🔬 Advanced Jupiter Analytics")
+    with col1:
+        if st.session_state.get('impact_analysis'):
+            amounts, impacts = st.session_state.impact_analysis
+            chart_df = pd.DataFrame({
+                'Price_Impact_Pct': impacts
+            }, index=amounts)
+            chart_df.index.name = 'Amount_SOL'
+            st.line_chart(chart_df)
+            
+            # Categorize by impact: 0 = low (<=0.1%), 1 = medium (<=0.5%), 2 = high
+            buckets = np.digitize(impacts, [0.1, 0.5], right=True)
+            low_impact = amounts[buckets == 0].tolist()
+            medium_impact = amounts[buckets == 1].tolist()
+            high_impact = amounts[buckets == 2].tolist()
+            
+            st.markdown("**Optimal Order Sizes:**")
+            if low_impact:
+                st.success(f"Low Impact (<0.1%): {', '.join(map(str, low_impact))} SOL")
+            if medium_impact:
+                st.warning(f"Medium Impact (0.1-0.5%): {', '.join(map(str, medium_impact))} SOL")
+            if high_impact:
+                st.error(f"High Impact (>0.5%): {', '.join(map(str, high_impact))} SOL")
+        else:
+            st.info("Click 'Analyze Price Impact' to see results")
+
+@st.fragment
+def render_route_tab(jupiter_api):
+    """Jupiter routing details for a single quote"""
+    st.subheader("🛣️ Jupiter Route Analysis")
+    route_amount = st.number_input("Amount for Route Analysis", min_value=0.1, value=5.0, step=0.1)
     
-    tab1, tab2, tab3 = st.tabs(["Price Impact Analysis", "Route Analysis", "Technical Indicators"])
+    if st.button("🗺️ Analyze Routes"):
+        with st.spinner("Fetching detailed routing information..."):
+            advanced_quote = jupiter_api.get_advanced_quote_with_routes(route_amount)
+            
+            if advanced_quote:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.metric("Price per SOL", f"${advanced_quote['price']:.4f}")
+                    st.metric("Price Impact", f"{advanced_quote['price_impact_pct']:.4f}%")
+                    st.metric("Output Amount", f"{advanced_quote['output_amount']:.2f} USDC")
+                
+                with col2:
+                    st.metric("Route Steps", advanced_quote['route_count'])
+                    st.metric("Processing Time", f"{advanced_quote.get('time_taken', 0)}ms")
+                    
+                if advanced_quote['routes']:
+                    st.markdown("**Routing Steps:**")
+                    for step, route in enumerate(advanced_quote['routes'], 1):
+                        percent = route.get('percent', 0)
+                        st.markdown(f"- Step {step}: {percent}% of trade")
+            else:
+                st.error("Unable to fetch routing data")
+
+@st.fragment
+def render_technical_tab(csv_logger, technical_analyzer):
+    """Technical indicators from the logged Jupiter prices"""
+    st.subheader("📈 Technical Analysis Dashboard")
     
-    with tab1:
-        st.subheader("📊 Price Impact Analysis")
-        col1, col2 = st.columns([2, 1])
-        
-        with col2:
-            if st.button("🔍 Analyze Price Impact"):
-                with st.spinner("Analyzing price impact across order sizes..."):
-                    amounts = [0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0]
-                    impact_data = jupiter_api.get_price_impact_analysis(amounts)
+    try:
+        price_logs_df = load_recent_price_logs(csv_logger, 100, csv_logger.get_file_signature())
+        if not price_logs_df.empty:
+            prices = price_logs_df['jupiter_price']
+            # Raw float64 array for the scalar reductions below (no copy for a float64 column)
+            price_arr = prices.to_numpy(dtype=np.float64)
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                if len(price_arr) > 14:
+                    try:
+                        # Only the latest value is displayed, so skip the full rolling series
+                        current_rsi = technical_analyzer.calculate_rsi_last(price_arr)
+                        
+                        st.metric("RSI (14)", f"{current_rsi:.1f}")
+                        if current_rsi > 70:
+                            st.error("Overbought")
+                        elif current_rsi < 30:
+                            st.success("Oversold")
+                        else:
+                            st.info("Neutral")
+                    except Exception:
+                        st.metric("RSI (14)", "Error")
+                else:
+                    st.metric("RSI (14)", "Need more data")
+            
+            with col2:
+                if len(price_arr) > 1:
+                    returns = np.diff(price_arr) / price_arr[:-1]
+                    returns = returns[np.isfinite(returns)]
+                    volatility = returns.std(ddof=1) * np.sqrt(24) if len(returns) > 1 else 0.0
+                    
+                    st.metric("24h Volatility", f"{volatility:.2%}")
                     
-                    if impact_data and any(v is not None for v in impact_data.values()):
-                        st.session_state.impact_analysis = impact_data
-                        st.success("Analysis complete!")
+                    if volatility > 0.1:
+                        st.error("High volatility")
+                    elif volatility > 0.05:
+                        st.warning("Medium volatility")
                     else:
-                        st.error("Unable to fetch price impact data")
-        
-        with col1:
-            if st.session_state.get('impact_analysis'):
-                valid_data = {k: v for k, v in st.session_state.impact_analysis.items() 
-                             if v is not None and not pd.isna(v) and isinstance(v, (int, float)) 
-                             and np.isfinite(v) and np.isfinite(k)}
-                
-                if valid_data and len(valid_data) >= 2:
-                    # Create properly validated chart data
-                    amounts = sorted(list(valid_data.keys()))
-                    impacts = [valid_data[a] for a in amounts]
+                        st.success("Low volatility")
+                else:
+                    st.metric("24h Volatility", "N/A")
+            
+            with col3:
+                current_price = price_arr[-1]
+                if len(price_arr) > 10:
+                    ma_short = np.nanmean(price_arr[-5:])
+                    ma_long = np.nanmean(price_arr[-20:])
                     
-                    # Only proceed if we have valid numeric data
-                    if all(isinstance(a, (int, float)) and isinstance(i, (int, float)) for a, i in zip(amounts, impacts)):
-                        chart_df = pd.DataFrame({
-                            'Price_Impact_Pct': impacts
-                        }, index=amounts)
-                        chart_df.index.name = 'Amount_SOL'
+                    momentum = ((current_price - ma_long) / ma_long) * 100
+                    st.metric("Price Momentum", f"{momentum:+.2f}%")
+                    
+                    if momentum > 2:
+                        st.success("Strong bullish")
+                    elif momentum > 0:
+                        st.success("Bullish")
+                    elif momentum > -2:
+                        st.info("Sideways")
+                    else:
+                        st.error("Bearish")
+                else:
+                    st.metric("Price Momentum", "N/A")
+            
+            # Price chart with moving averages
+            if len(prices) >= 10:
+                try:
+                    # Moving averages are maintained by the logger as prices are written
+                    chart_df = price_logs_df.tail(50).rename(columns={'ma5': 'MA_5', 'ma20': 'MA_20'})
+                    if len(chart_df) < 20:
+                        chart_df = chart_df.drop(columns=['MA_20'], errors='ignore')
+                    
+                    # Ensure we have valid data before calculations
+                    if 'jupiter_price' in chart_df.columns and not chart_df['jupiter_price'].empty:
+                        # Clean and validate data
+                        valid_mask = (
+                            pd.notna(chart_df['jupiter_price']) & 
+                            pd.notna(chart_df['timestamp']) &
+                            (chart_df['jupiter_price'] > 0) &
+                            np.isfinite(chart_df['jupiter_price'])
+                        )
                         
-                        # Final validation - ensure no inf/nan values
-                        if not chart_df.isnull().any().any() and np.isfinite(chart_df.values).all():
-                            st.line_chart(chart_df)
+                        clean_df = chart_df[valid_mask]
+                        
+                        if len(clean_df) >= 5:
+                            # Build the chart columns as arrays and drop non-finite rows with one mask
+                            # Timestamps are already datetime64 from the CSV read
+                            timestamps = clean_df['timestamp'].values
+                            prices = clean_df['jupiter_price'].to_numpy(dtype=float)
+                            ma5 = clean_df['MA_5'].to_numpy(dtype=float)
+                            mask = np.isfinite(prices) & np.isfinite(ma5)
+                            
+                            columns = {'Price': prices, 'MA 5': ma5}
+                            if 'MA_20' in clean_df.columns:
+                                ma20 = clean_df['MA_20'].to_numpy(dtype=float)
+                                mask &= np.isfinite(ma20)
+                                columns['MA 20'] = ma20
                             
-                            # Categorize by impact
-                            low_impact = [k for k, v in valid_data.items() if v <= 0.1]
-                            medium_impact = [k for k, v in valid_data.items() if 0.1 < v <= 0.5]
-                            high_impact = [k for k, v in valid_data.items() if v > 0.5]
+                            chart_data = pd.DataFrame({name: values[mask] for name, values in columns.items()},
+                                                      index=timestamps[mask])
                             
-                            st.markdown("**Optimal Order Sizes:**")
-                            if low_impact:
-                                st.success(f"Low Impact (<0.1%): {', '.join(map(str, low_impact))} SOL")
-                            if medium_impact:
-                                st.warning(f"Medium Impact (0.1-0.5%): {', '.join(map(str, medium_impact))} SOL")
-                            if high_impact:
-                                st.error(f"High Impact (>0.5%): {', '.join(map(str, high_impact))} SOL")
+                            if not chart_data.empty and len(chart_data) > 1:
+                                st.line_chart(chart_data)
+                            else:
+                                st.info("Building chart with more data points...")
                         else:
-                            st.info("Price impact data contains invalid values")
+                            st.info("Collecting price data for chart...")
                     else:
-                        st.info("Invalid price impact data format")
-                else:
-                    st.info("Click 'Analyze Price Impact' to see results")
+                        st.info("Start price monitoring to see price chart")
+                except Exception:
+                    st.info("Price chart will appear after data collection")
+        else:
+            st.info("Start price monitoring to see technical analysis")
     
-    with tab2:
-        st.subheader("🛣️ Jupiter Route Analysis")
-        route_amount = st.number_input("Amount for Route Analysis", min_value=0.1, value=5.0, step=0.1)
-        
-        if st.button("🗺️ Analyze Routes"):
-            with st.spinner("Fetching detailed routing information..."):
-                advanced_quote = jupiter_api.get_advanced_quote_with_routes(route_amount)
+    except Exception as e:
+        st.error(f"Technical analysis error: {str(e)}")
+
+@st.fragment
+def render_pricing_assistant(jupiter_api):
+    """Optimal pricing suggestions for a new offer"""
+    st.subheader("💡 Optimal Pricing Suggestions")
+    suggest_type = st.selectbox("Order Type", ["BUY", "SELL"])
+    suggest_amount = st.number_input("Order Amount (SOL)", min_value=0.1, value=1.0, step=0.1)
+    
+    if st.button("🔮 Get Pricing Suggestion"):
+        if st.session_state.get('last_jupiter_price'):
+            quote_data = jupiter_api.get_advanced_quote_with_routes(suggest_amount)
+            
+            if quote_data:
+                jupiter_price = quote_data['price']
+                price_impact = quote_data['price_impact_pct']
                 
-                if advanced_quote:
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.metric("Price per SOL", f"${advanced_quote['price']:.4f}")
-                        st.metric("Price Impact", f"{advanced_quote['price_impact_pct']:.4f}%")
-                        st.metric("Output Amount", f"{advanced_quote['output_amount']:.2f} USDC")
-                    
-                    with col2:
-                        st.metric("Route Steps", advanced_quote['route_count'])
-                        st.metric("Processing Time", f"{advanced_quote.get('time_taken', 0)}ms")
-                        
-                    if advanced_quote['routes']:
-                        st.markdown("**Routing Steps:**")
-                        for route in advanced_quote['routes']:
-                            percent = route.get('percent', 0)
-                            st.markdown(f"- Step {route['step']}: {percent}% of trade")
+                # Calculate suggested pricing
+                base_adjustment = 0.5
+                impact_adjustment = price_impact * 0.5
+                market_vol = abs(st.session_state.get('market_data', {}).get('solana', {}).get('change_24h', 0)) * 0.1
+                
+                total_adjustment = base_adjustment + impact_adjustment + market_vol
+                
+                if suggest_type == "BUY":
+                    suggested_price = jupiter_price * (1 + total_adjustment / 100)
+                    st.success(f"Suggested Buy Price: ${suggested_price:.4f}")
+                    st.info(f"Premium: {total_adjustment:.2f}%")
                 else:
-                    st.error("Unable to fetch routing data")
+                    suggested_price = jupiter_price * (1 - total_adjustment / 100)
+                    st.success(f"Suggested Sell Price: ${suggested_price:.4f}")
+                    st.info(f"Discount: {total_adjustment:.2f}%")
+                
+                st.markdown(f"**Jupiter Reference:** ${jupiter_price:.4f}")
+                st.markdown(f"**Price Impact:** {price_impact:.4f}%")
+            else:
+                st.error("Unable to fetch pricing data")
+        else:
+            st.warning("Please refresh Jupiter price first")
+
+@st.fragment
+def render_arbitrage_scanner(jupiter_api, otc_pool):
+    """Scan active offers for arbitrage against Jupiter"""
+    st.subheader("⚖️ Arbitrage Scanner")
     
-    with tab3:
-        st.subheader("📈 Technical Analysis Dashboard")
+    if st.button("🔍 Scan Arbitrage Opportunities"):
+        active_offers = load_active_offers(otc_pool, otc_pool.version)
+        jupiter_price = st.session_state.get('last_jupiter_price')
         
-        try:
-            price_logs_df = csv_logger.get_recent_price_logs(limit=100)
-            if not price_logs_df.empty:
-                price_logs_df['timestamp'] = pd.to_datetime(price_logs_df['timestamp'])
-                price_logs_df = price_logs_df.sort_values('timestamp')
-                prices = price_logs_df['jupiter_price']
+        if active_offers and jupiter_price:
+            with st.spinner("Scanning for arbitrage opportunities..."):
+                # Offer columns as arrays so spreads and scores are computed in bulk
+                n_offers = len(active_offers)
+                otc_prices = np.fromiter((o['price_per_sol'] for o in active_offers), dtype=np.float64, count=n_offers)
+                is_buy = np.fromiter((o['type'] == 'BUY' for o in active_offers), dtype=bool, count=n_offers)
+                spreads = np.where(is_buy, otc_prices - jupiter_price, jupiter_price - otc_prices) / jupiter_price * 100
                 
-                col1, col2, col3 = st.columns(3)
+                # Only fetch detailed quotes where the spread looks promising
+                candidate_idx = np.flatnonzero(np.abs(spreads) > 1.0)
                 
-                with col1:
-                    if len(prices) > 14 and isinstance(prices, pd.Series):
-                        try:
-                            delta = prices.diff()
-                            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                            
-                            # Avoid division by zero
-                            rs = gain.div(loss).fillna(0)
-                            rsi = 100 - (100 / (1 + rs))
-                            
-                            # Get the last valid RSI value
-                            valid_rsi = rsi.dropna()
-                            if len(valid_rsi) > 0:
-                                current_rsi = valid_rsi.iloc[-1]
-                                
-                                st.metric("RSI (14)", f"{current_rsi:.1f}")
-                                if current_rsi > 70:
-                                    st.error("Overbought")
-                                elif current_rsi < 30:
-                                    st.success("Oversold")
-                                else:
-                                    st.info("Neutral")
-                            else:
-                                st.metric("RSI (14)", "Calculating...")
-                        except Exception:
-                            st.metric("RSI (14)", "Error")
-                    else:
-                        st.metric("RSI (14)", "Need more data")
+                # Request all candidate quotes at once instead of one round-trip per offer;
+                # failed quotes are reported here and leave the offer without impact data
+                candidate_amounts = [active_offers[i]['sol_amount'] for i in candidate_idx]
+                quotes = jupiter_api.get_multiple_quotes(candidate_amounts)
                 
-                with col2:
-                    if len(prices) > 1:
-                        returns = prices.pct_change().dropna()
-                        volatility = returns.std() * np.sqrt(24)
-                        
-                        st.metric("24h Volatility", f"{volatility:.2%}")
-                        
-                        if volatility > 0.1:
-                            st.error("High volatility")
-                        elif volatility > 0.05:
-                            st.warning("Medium volatility")
-                        else:
-                            st.success("Low volatility")
-                    else:
-                        st.metric("24h Volatility", "N/A")
+                price_impacts = np.zeros(candidate_idx.size)
+                has_impact = np.zeros(candidate_idx.size, dtype=bool)
                 
-                with col3:
-                    current_price = prices.iloc[-1]
-                    if len(prices) > 10:
-                        ma_short = prices.tail(5).mean()
-                        ma_long = prices.tail(20).mean() if len(prices) >= 20 else prices.mean()
-                        
-                        momentum = ((current_price - ma_long) / ma_long) * 100
-                        st.metric("Price Momentum", f"{momentum:+.2f}%")
-                        
-                        if momentum > 2:
-                            st.success("Strong bullish")
-                        elif momentum > 0:
-                            st.success("Bullish")
-                        elif momentum > -2:
-                            st.info("Sideways")
-                        else:
-                            st.error("Bearish")
-                    else:
-                        st.metric("Price Momentum", "N/A")
+                for j, amount in enumerate(candidate_amounts):
+                    quote_data = quotes[amount]
+                    if quote_data and 'price_impact_pct' in quote_data:
+                        price_impacts[j] = quote_data['price_impact_pct']
+                        has_impact[j] = True
                 
-                # Price chart with moving averages
-                if len(prices) >= 10:
-                    try:
-                        chart_df = price_logs_df.tail(50).copy()
+                candidate_spreads = spreads[candidate_idx]
+                net_spreads = candidate_spreads - price_impacts
+                # Lower net threshold with impact data, higher gross threshold without it
+                scores = np.where(
+                    has_impact,
+                    np.clip(net_spreads * 15, 0, 100),
+                    np.clip(np.abs(candidate_spreads) * 10, 0, 100)
+                )
+                profitable = np.where(has_impact, net_spreads > 0.25, np.abs(candidate_spreads) > 2.0)
+                
+                hits = np.flatnonzero(profitable)
+                # Rank once with NumPy and keep the top 5 as plain tuples for display
+                top = hits[np.argsort(-scores[hits], kind='stable')[:5]]
+                
+                if hits.size:
+                    st.success(f"Found {hits.size} arbitrage opportunities!")
+                    
+                    # One table for the top 5 instead of a block of metric widgets per offer
+                    top_offers = [active_offers[i] for i in candidate_idx[top].tolist()]
+                    top_scores = scores[top]
+                    top_df = pd.DataFrame({
+                        'Tier': np.select([top_scores > 70, top_scores > 40], ['🎯 High', '⚡ Medium'], default='📊 Low'),
+                        'Offer ID': [o['id'] for o in top_offers],
+                        'Type': [o['type'] for o in top_offers],
+                        'Amount (SOL)': [o['sol_amount'] for o in top_offers],
+                        'OTC Price': [o['price_per_sol'] for o in top_offers],
+                        'Gross Spread %': candidate_spreads[top],
+                        'Net Spread %': net_spreads[top],
+                        'Score': top_scores
+                    }, index=pd.RangeIndex(1, top.size + 1, name='Rank'))
+                    
+                    # Color-coded header for the best opportunity
+                    best_score = top_scores[0]
+                    if best_score > 70:
+                        st.success(f"🎯 **Top Opportunity: Offer #{top_offers[0]['id']}** ({best_score:.0f}/100)")
+                    elif best_score > 40:
+                        st.warning(f"⚡ **Top Opportunity: Offer #{top_offers[0]['id']}** ({best_score:.0f}/100)")
+                    else:
+                        st.info(f"📊 **Top Opportunity: Offer #{top_offers[0]['id']}** ({best_score:.0f}/100)")
+                    
+                    st.dataframe(
+                        top_df.style.format({
+                            'OTC Price': '${:.4f}',
+                            'Gross Spread %': '{:.2f}%',
+                            'Net Spread %': '{:.2f}%',
+                            'Score': '{:.0f}/100'
+                        }).background_gradient(subset=['Score'], cmap='Greens', vmin=0, vmax=100),
+                        use_container_width=True
+                    )
+                else:
+                    st.info("No profitable arbitrage opportunities found at current market conditions")
+                    
+                    # Show why no opportunities exist
+                    if active_offers:
+                        st.markdown("**Analysis Summary:**")
+                        total_offers = len(active_offers)
+                        buy_offers = int(is_buy.sum())
+                        sell_offers = total_offers - buy_offers
                         
-                        # Ensure we have valid data before calculations
-                        if 'jupiter_price' in chart_df.columns and not chart_df['jupiter_price'].empty:
-                            # Calculate moving averages
-                            chart_df['MA_5'] = chart_df['jupiter_price'].rolling(window=5, min_periods=1).mean()
-                            if len(chart_df) >= 20:
-                                chart_df['MA_20'] = chart_df['jupiter_price'].rolling(window=20, min_periods=1).mean()
-                            
-                            # Clean and validate data
-                            valid_mask = (
-                                pd.notna(chart_df['jupiter_price']) & 
-                                pd.notna(chart_df['timestamp']) &
-                                (chart_df['jupiter_price'] > 0) &
-                                np.isfinite(chart_df['jupiter_price'])
-                            )
-                            
-                            clean_df = chart_df[valid_mask].copy()
-                            
-                            if len(clean_df) >= 5:
-                                # Create chart data with proper structure
-                                timestamps = pd.to_datetime(clean_df['timestamp'])
-                                prices = clean_df['jupiter_price'].values
-                                ma5_series = clean_df['MA_5'].fillna(clean_df['jupiter_price'])
-                                
-                                chart_data = pd.DataFrame({
-                                    'Price': prices,
-                                    'MA 5': ma5_series.values
-                                }, index=timestamps)
-                                
-                                if 'MA_20' in clean_df.columns:
-                                    ma20_series = clean_df['MA_20'].fillna(clean_df['jupiter_price'])
-                                    chart_data['MA 20'] = ma20_series.values
-                                
-                                # Final validation - ensure all values are finite
-                                chart_data = chart_data.select_dtypes(include=[np.number])
-                                chart_data = chart_data.replace([np.inf, -np.inf], np.nan).dropna()
-                                
-                                if not chart_data.empty and len(chart_data) > 1:
-                                    st.line_chart(chart_data)
-                                else:
-                                    st.info("Building chart with more data points...")
-                            else:
-                                st.info("Collecting price data for chart...")
-                        else:
-                            st.info("Start price monitoring to see price chart")
-                    except Exception:
-                        st.info("Price chart will appear after data collection")
+                        st.markdown(f"- Analyzed {total_offers} offers ({buy_offers} BUY, {sell_offers} SELL)")
+                        st.markdown(f"- Jupiter reference price: ${jupiter_price:.4f}")
+                        st.markdown("- All spreads below profitability threshold (0.25%)")
+        else:
+            if not active_offers:
+                st.warning("No active offers in the pool. Create some offers first!")
             else:
-                st.info("Start price monitoring to see technical analysis")
+                st.warning("Jupiter price not available. Try refreshing market data.")
+
+def write_theme_config(theme_option: str, path: str = '.streamlit/config.toml') -> bool:
+    """
+    Write the Streamlit config for a theme, skipping the write when the file already matches
+    
+    Args:
+        theme_option: Key into THEME_COLORS
+        path: Config file location
         
-        except Exception as e:
-            st.error(f"Technical analysis error: {str(e)}")
+    Returns:
+        True if the file was written
+    """
+    selected_theme = THEME_COLORS[theme_option]
+    config_content = f"""[server]
+headless = true
+address = "0.0.0.0"
+port = 5000
+
+[theme]
+base = "{'light' if theme_option == 'Light Mode' else 'dark'}"
+primaryColor = "{selected_theme['primary']}"
+backgroundColor = "{selected_theme['bg']}"
+secondaryBackgroundColor = "{selected_theme['secondary']}"
+textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
+"""
+    
+    try:
+        with open(path) as f:
+            if f.read() == config_content:
+                return False
+    except OSError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    with open(path, 'w') as f:
+        f.write(config_content)
+    return True
+
+@st.fragment(run_every=5)
+def watch_price_monitor(price_monitor):
+    """Rerun the app only when the monitor has published a price this session has not shown"""
+    snapshot = price_monitor.get_latest_snapshot()
+    if snapshot and snapshot[2] > st.session_state.get('last_update_mono', float('-inf')):
+        st.rerun()
+
+def main():
+    st.set_page_config(
+        page_title="OTC Trading Pool Simulator",
+        page_icon="💱",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    st.title("💱 OTC Trading Pool Simulator")
+    st.markdown("### SOL → USDC Private Pool vs Jupiter DEX")
+    
+    # Initialize components
+    jupiter_api, otc_pool, csv_logger, price_monitor, technical_analyzer = init_components()
+    
+    # Real-time market data section
+    st.header("📊 Live Market Data")
+    
+    render_market_data(jupiter_api)
+    
+    st.divider()
+    
+    # Advanced Jupiter Analytics Section
+    st.header("🔬 Advanced Jupiter Analytics")
+    
+    tab1, tab2, tab3 = st.tabs(["Price Impact Analysis", "Route Analysis", "Technical Indicators"])
+    
+    with tab1:
+        render_price_impact_tab(jupiter_api)
+    
+    with tab2:
+        render_route_tab(jupiter_api)
+    
+    with tab3:
+        render_technical_tab(csv_logger, technical_analyzer)
     
     # Smart Trading Assistant
     st.header("🎯 Smart Trading Assistant")
@@ -393,160 +673,10 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("💡 Optimal Pricing Suggestions")
-        suggest_type = st.selectbox("Order Type", ["BUY", "SELL"])
-        suggest_amount = st.number_input("Order Amount (SOL)", min_value=0.1, value=1.0, step=0.1)
-        
-        if st.button("🔮 Get Pricing Suggestion"):
-            if st.session_state.get('last_jupiter_price'):
-                quote_data = jupiter_api.get_advanced_quote_with_routes(suggest_amount)
-                
-                if quote_data:
-                    jupiter_price = quote_data['price']
-                    price_impact = quote_data['price_impact_pct']
-                    
-                    # Calculate suggested pricing
-                    base_adjustment = 0.5
-                    impact_adjustment = price_impact * 0.5
-                    market_vol = abs(st.session_state.get('market_data', {}).get('solana', {}).get('change_24h', 0)) * 0.1
-                    
-                    total_adjustment = base_adjustment + impact_adjustment + market_vol
-                    
-                    if suggest_type == "BUY":
-                        suggested_price = jupiter_price * (1 + total_adjustment / 100)
-                        st.success(f"Suggested Buy Price: ${suggested_price:.4f}")
-                        st.info(f"Premium: {total_adjustment:.2f}%")
-                    else:
-                        suggested_price = jupiter_price * (1 - total_adjustment / 100)
-                        st.success(f"Suggested Sell Price: ${suggested_price:.4f}")
-                        st.info(f"Discount: {total_adjustment:.2f}%")
-                    
-                    st.markdown(f"**Jupiter Reference:** ${jupiter_price:.4f}")
-                    st.markdown(f"**Price Impact:** {price_impact:.4f}%")
-                else:
-                    st.error("Unable to fetch pricing data")
-            else:
-                st.warning("Please refresh Jupiter price first")
+        render_pricing_assistant(jupiter_api)
     
     with col2:
-        st.subheader("⚖️ Arbitrage Scanner")
-        
-        if st.button("🔍 Scan Arbitrage Opportunities"):
-            active_offers = otc_pool.get_active_offers()
-            jupiter_price = st.session_state.get('last_jupiter_price')
-            
-            if active_offers and jupiter_price:
-                with st.spinner("Scanning for arbitrage opportunities..."):
-                    opportunities = []
-                    
-                    for offer in active_offers:
-                        otc_price = offer['price_per_sol']
-                        offer_type = offer['type']
-                        amount = offer['sol_amount']
-                        
-                        # Calculate basic spread first
-                        if offer_type == 'BUY':
-                            spread = ((otc_price - jupiter_price) / jupiter_price) * 100
-                        else:
-                            spread = ((jupiter_price - otc_price) / jupiter_price) * 100
-                        
-                        # Only fetch detailed quote if spread looks promising
-                        if abs(spread) > 1.0:  # Pre-filter for efficiency
-                            try:
-                                quote_data = jupiter_api.get_sol_usdc_quote(amount)
-                                if quote_data and 'price_impact_pct' in quote_data:
-                                    price_impact_raw = quote_data.get('price_impact_pct', 0)
-                                    
-                                    # Handle different price impact formats
-                                    if isinstance(price_impact_raw, str):
-                                        try:
-                                            price_impact = float(price_impact_raw.replace('%', ''))
-                                        except:
-                                            price_impact = 0.0
-                                    else:
-                                        price_impact = float(price_impact_raw) if price_impact_raw else 0.0
-                                    
-                                    net_spread = spread - price_impact
-                                    
-                                    # Lower threshold for better opportunity detection
-                                    if net_spread > 0.25:
-                                        score = min(100, max(0, net_spread * 15))  # More generous scoring
-                                        opportunities.append({
-                                            'id': offer['id'],
-                                            'type': offer_type,
-                                            'amount': amount,
-                                            'otc_price': otc_price,
-                                            'jupiter_price': jupiter_price,
-                                            'spread': spread,
-                                            'price_impact': price_impact,
-                                            'net_spread': net_spread,
-                                            'score': score
-                                        })
-                                else:
-                                    # Fallback without price impact
-                                    if abs(spread) > 2.0:  # Higher threshold without impact data
-                                        opportunities.append({
-                                            'id': offer['id'],
-                                            'type': offer_type,
-                                            'amount': amount,
-                                            'otc_price': otc_price,
-                                            'jupiter_price': jupiter_price,
-                                            'spread': spread,
-                                            'price_impact': 0.0,
-                                            'net_spread': spread,
-                                            'score': min(100, max(0, abs(spread) * 10))
-                                        })
-                            except Exception as e:
-                                st.warning(f"Error analyzing offer #{offer['id']}: {str(e)}")
-                                continue
-                    
-                    if opportunities:
-                        st.success(f"Found {len(opportunities)} arbitrage opportunities!")
-                        opportunities.sort(key=lambda x: x['score'], reverse=True)
-                        
-                        # Display top opportunities
-                        for i, opp in enumerate(opportunities[:5]):  # Show top 5
-                            score = opp['score'] 
-                            
-                            # Color coding
-                            if score > 70:
-                                st.success(f"🎯 **High Value Opportunity #{i+1}**")
-                            elif score > 40:
-                                st.warning(f"⚡ **Medium Opportunity #{i+1}**")
-                            else:
-                                st.info(f"📊 **Low Opportunity #{i+1}**")
-                            
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("Offer ID", f"#{opp['id']}")
-                                st.metric("Type", opp['type'])
-                            with col2:
-                                st.metric("Amount", f"{opp['amount']} SOL")
-                                st.metric("OTC Price", f"${opp['otc_price']:.4f}")
-                            with col3:
-                                st.metric("Gross Spread", f"{opp['spread']:.2f}%")
-                                st.metric("Net Spread", f"{opp['net_spread']:.2f}%")
-                            
-                            st.metric("Opportunity Score", f"{score:.0f}/100")
-                            st.divider()
-                    else:
-                        st.info("No profitable arbitrage opportunities found at current market conditions")
-                        
-                        # Show why no opportunities exist
-                        if active_offers:
-                            st.markdown("**Analysis Summary:**")
-                            total_offers = len(active_offers)
-                            buy_offers = len([o for o in active_offers if o['type'] == 'BUY'])
-                            sell_offers = len([o for o in active_offers if o['type'] == 'SELL'])
-                            
-                            st.markdown(f"- Analyzed {total_offers} offers ({buy_offers} BUY, {sell_offers} SELL)")
-                            st.markdown(f"- Jupiter reference price: ${jupiter_price:.4f}")
-                            st.markdown("- All spreads below profitability threshold (0.25%)")
-            else:
-                if not active_offers:
-                    st.warning("No active offers in the pool. Create some offers first!")
-                else:
-                    st.warning("Jupiter price not available. Try refreshing market data.")
+        render_arbitrage_scanner(jupiter_api, otc_pool)
     
     st.divider()
     
@@ -562,6 +692,13 @@ def main():
     if 'last_market_update' not in st.session_state:
         st.session_state.last_market_update = None
     
+    # Pick up prices published by the background monitor thread without a network call
+    snapshot = price_monitor.get_latest_snapshot()
+    if snapshot and snapshot[2] > st.session_state.get('last_update_mono', float('-inf')):
+        (st.session_state.last_jupiter_price,
+         st.session_state.last_update_time,
+         st.session_state.last_update_mono) = snapshot
+    
     # Sidebar for configuration
     with st.sidebar:
         st.header("⚙️ Configuration")
@@ -570,39 +707,16 @@ def main():
         st.subheader("🎨 Theme Options")
         theme_option = st.selectbox(
             "Choose Theme",
-            ["Dark Green", "Dark Blue", "Purple", "Orange", "Red", "Light Mode"],
+            list(THEME_COLORS),
             index=0
         )
         
         # Apply theme changes
         if theme_option != st.session_state.get('current_theme', 'Dark Green'):
             st.session_state.current_theme = theme_option
-            theme_colors = {
-                "Dark Green": {"primary": "#00ff88", "bg": "#0e1117", "secondary": "#262730"},
-                "Dark Blue": {"primary": "#1f77b4", "bg": "#0e1117", "secondary": "#262730"},
-                "Purple": {"primary": "#9467bd", "bg": "#0e1117", "secondary": "#262730"},
-                "Orange": {"primary": "#ff7f0e", "bg": "#0e1117", "secondary": "#262730"},
-                "Red": {"primary": "#d62728", "bg": "#0e1117", "secondary": "#262730"},
-                "Light Mode": {"primary": "#ff4b4b", "bg": "#ffffff", "secondary": "#f0f2f6"}
-            }
             
             # Update config file
-            selected_theme = theme_colors[theme_option]
-            config_content = f"""[server]
-headless = true
-address = "0.0.0.0"
-port = 5000
-
-[theme]
-base = "{'light' if theme_option == 'Light Mode' else 'dark'}"
-primaryColor = "{selected_theme['primary']}"
-backgroundColor = "{selected_theme['bg']}"
-secondaryBackgroundColor = "{selected_theme['secondary']}"
-textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
-"""
-            
-            with open('.streamlit/config.toml', 'w') as f:
-                f.write(config_content)
+            write_theme_config(theme_option)
             
             st.info("Theme updated! Refresh the page to see changes.")
         
@@ -647,7 +761,6 @@ textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
             if submitted:
                 offer_id = otc_pool.add_offer(offer_type, sol_amount, price_per_sol)
                 st.success(f"Offer posted! ID: {offer_id}")
-                st.rerun()
     
     with col2:
         st.header("💰 Current Jupiter Price")
@@ -659,6 +772,7 @@ textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
                 if price_data:
                     st.session_state.last_jupiter_price = price_data['price']
                     st.session_state.last_update_time = datetime.now()
+                    st.session_state.last_update_mono = time.monotonic()
                     st.success(f"Updated! Price: ${price_data['price']:.4f}")
                 else:
                     st.error("Failed to fetch Jupiter price")
@@ -673,71 +787,50 @@ textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
                 st.metric("Current Jupiter Price", f"${st.session_state.last_jupiter_price:.4f}")
             with col2:
                 if st.session_state.last_update_time:
-                    time_diff = (datetime.now() - st.session_state.last_update_time).seconds
+                    time_diff = int(time.monotonic() - st.session_state.get('last_update_mono', time.monotonic()))
                     st.metric("Last Update", f"{time_diff}s ago")
             
             # Show price comparison for active offers with color coding
-            active_offers = otc_pool.get_active_offers()
+            active_offers = load_active_offers(otc_pool, otc_pool.version)
             if active_offers:
                 st.subheader("🔍 Price Comparison")
-                for offer in active_offers[-3:]:  # Show last 3 offers
-                    jupiter_price = st.session_state.last_jupiter_price
-                    otc_price = offer['price_per_sol']
-                    
-                    # Create columns for better layout
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**{offer['type']} #{offer['id']}** - {offer['sol_amount']} SOL")
-                    
-                    with col2:
-                        st.write(f"${otc_price:.4f}")
-                    
-                    with col3:
-                        if offer['type'] == 'BUY':
-                            spread = ((otc_price - jupiter_price) / jupiter_price) * 100
-                            if spread > 0:
-                                st.markdown(f"<span style='color: #00ff88'>+{spread:.2f}%</span>", unsafe_allow_html=True)
-                            else:
-                                st.markdown(f"<span style='color: #ff4444'>{spread:.2f}%</span>", unsafe_allow_html=True)
-                        else:  # SELL
-                            spread = ((jupiter_price - otc_price) / jupiter_price) * 100
-                            if spread > 0:
-                                st.markdown(f"<span style='color: #00ff88'>+{spread:.2f}%</span>", unsafe_allow_html=True)
-                            else:
-                                st.markdown(f"<span style='color: #ff4444'>{spread:.2f}%</span>", unsafe_allow_html=True)
+                recent_offers = active_offers[-3:]  # Show last 3 offers
+                comparison_df = pd.DataFrame({
+                    'Offer': [f"{o['type']} #{o['id']} - {o['sol_amount']} SOL" for o in recent_offers],
+                    'OTC Price': [o['price_per_sol'] for o in recent_offers],
+                    'Spread %': calculate_spread(
+                        [o['type'] for o in recent_offers],
+                        [o['price_per_sol'] for o in recent_offers],
+                        st.session_state.last_jupiter_price
+                    )
+                })
+                st.dataframe(
+                    comparison_df.style
+                        .format({'OTC Price': '${:.4f}', 'Spread %': '{:+.2f}%'})
+                        .map(color_spread, subset=['Spread %']),
+                    use_container_width=True,
+                    hide_index=True
+                )
     
     # Active offers section with enhanced styling
     st.header("📊 Active OTC Offers")
     
-    active_offers = otc_pool.get_active_offers()
+    active_offers = load_active_offers(otc_pool, otc_pool.version)
     if active_offers:
-        offers_df = pd.DataFrame(active_offers)
+        offers_df = load_active_offers_frame(otc_pool, otc_pool.version)
         
         # Add comparison columns if Jupiter price is available
         if st.session_state.last_jupiter_price:
             jupiter_price = st.session_state.last_jupiter_price
             offers_df['Jupiter Price'] = jupiter_price
-            offers_df['Spread %'] = offers_df.apply(
-                lambda row: calculate_spread(row['type'], row['price_per_sol'], jupiter_price), 
-                axis=1
-            )
+            spreads = calculate_spread(offers_df['type'].to_numpy(), offers_df['price_per_sol'].to_numpy(), jupiter_price)
+            offers_df['Spread %'] = spreads
             # Enhanced status with color coding
-            def format_status(spread):
-                if spread > 5:
-                    return "🟢 Excellent"
-                elif spread > 1:
-                    return "🟡 Good"
-                elif spread > -1:
-                    return "⚪ Fair"
-                else:
-                    return "🔴 Poor"
-            
-            offers_df['Status'] = offers_df['Spread %'].apply(format_status)
+            offers_df['Status'] = classify_spread(spreads)
         
         # Format the dataframe for display with better column names
         display_df = offers_df.copy()
-        display_df['Created'] = pd.to_datetime(display_df['timestamp']).dt.strftime('%H:%M:%S')
+        display_df['Created'] = display_df['timestamp'].dt.strftime('%H:%M:%S')  # Already datetime64
         display_df = display_df.drop(['timestamp', 'user_id', 'created_at'], axis=1, errors='ignore')
         
         # Rename columns for better display
@@ -751,39 +844,28 @@ textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
         }
         display_df = display_df.rename(columns=column_mapping)
         
-        # Apply color styling to dataframe
-        def highlight_spreads(val):
-            if isinstance(val, (int, float)):
-                if val > 5:
-                    return 'background-color: rgba(0, 255, 136, 0.3)'
-                elif val > 1:
-                    return 'background-color: rgba(255, 193, 7, 0.3)'
-                elif val > -1:
-                    return 'background-color: rgba(255, 255, 255, 0.1)'
-                else:
-                    return 'background-color: rgba(255, 68, 68, 0.3)'
-            return ''
-        
-        if 'Spread %' in display_df.columns:
-            styled_df = display_df.style.map(highlight_spreads, subset=['Spread %'])
-            st.dataframe(styled_df, use_container_width=True)
-        else:
-            st.dataframe(display_df, use_container_width=True)
+        # Spread bins are already shown by the emoji Status column, so render natively without a Styler
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            column_config={'Spread %': st.column_config.NumberColumn(format="%+.2f%%")}
+        )
         
         # Offer management
         st.subheader("🗑️ Manage Offers")
         col1, col2 = st.columns(2)
         
         with col1:
-            offer_to_cancel = st.selectbox(
+            # Select by offer ID so cancelling needs no label parsing
+            cancel_labels = load_cancel_options(otc_pool, otc_pool.version)
+            offer_id = st.selectbox(
                 "Select offer to cancel",
-                options=[f"#{offer['id']} - {offer['type']} {offer['sol_amount']} SOL @ ${offer['price_per_sol']}" 
-                        for offer in active_offers],
+                options=list(cancel_labels),
+                format_func=cancel_labels.__getitem__,
                 key="cancel_select"
             )
             
             if st.button("Cancel Offer"):
-                offer_id = int(offer_to_cancel.split('#')[1].split(' ')[0])
                 if otc_pool.cancel_offer(offer_id):
                     st.success(f"Offer #{offer_id} cancelled!")
                     st.rerun()
@@ -824,17 +906,27 @@ textColor = "{'#262730' if theme_option == 'Light Mode' else '#ffffff'}"
     
     # Auto-refresh for monitoring
     if st.session_state.monitoring_active:
-        time.sleep(1)
-        st.rerun()
+        watch_price_monitor(price_monitor)
+
+def calculate_spread(offer_types, otc_prices, jupiter_price):
+    """Calculate spread percentages for arrays of offers based on offer type"""
+    # For buy offers, positive spread means OTC price is higher (good for seller);
+    # for sell offers, positive spread means OTC price is lower (good for buyer)
+    # Computed in place on a single buffer
+    spreads = np.array(otc_prices, dtype=float)
+    spreads -= jupiter_price
+    spreads *= 100 / jupiter_price
+    np.negative(spreads, out=spreads, where=np.asarray(offer_types) != 'BUY')
+    return spreads
+
+def classify_spread(spreads):
+    """Map spread percentages to status labels with one binary search per value"""
+    # side='left' keeps the thresholds strict (a spread of exactly 5 is Good)
+    return _SPREAD_STATUS[np.searchsorted(_SPREAD_EDGES, spreads, side='left')]
 
-def calculate_spread(offer_type, otc_price, jupiter_price):
-    """Calculate spread percentage based on offer type"""
-    if offer_type == 'BUY':
-        # For buy offers, positive spread means OTC price is higher (good for seller)
-        return ((otc_price - jupiter_price) / jupiter_price) * 100
-    else:  # SELL
-        # For sell offers, positive spread means OTC price is lower (good for buyer)
-        return ((jupiter_price - otc_price) / jupiter_price) * 100
+def color_spread(val):
+    """Green text for favorable (positive) spreads, red otherwise"""
+    return f"color: {'#00ff88' if val > 0 else '#ff4444'}"
 
 if __name__ == "__main__":
     main()
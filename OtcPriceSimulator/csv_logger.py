@@ -1,42 +1,158 @@
+import atexit
 import csv
+import glob
+import gzip
+import io
 import os
+import shutil
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import threading
+from collections import deque
 
 class CSVLogger:
     """CSV logger for matches and price data"""
     
+    MATCH_COLUMNS = [
+        'timestamp', 'buy_id', 'sell_id', 'match_amount', 'match_price',
+        'buy_price', 'sell_price', 'spread', 'total_usdc', 'jupiter_price',
+        'otc_vs_jupiter_spread'
+    ]
+    PRICE_COLUMNS = [
+        'timestamp', 'jupiter_price', 'input_amount', 'output_amount',
+        'price_impact_pct', 'route_count', 'ma5', 'ma20'
+    ]
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'  # Written by the log methods, parsed without inference
+    MIRROR_SIZE = 1000  # Recent rows kept in memory per log
+    ROLLOVER_ROWS = 10000  # Price rows kept in CSV before rolling them into a compressed shard
+    MAX_SHARDS = 20  # Rolled-over shards kept per log; older ones are deleted
+    
     def __init__(self, matches_file: str = "otc_matches.csv", 
                  prices_file: str = "jupiter_prices.csv"):
         self.matches_file = matches_file
         self.prices_file = prices_file
         self.lock = threading.Lock()
+        self.recent_prices = deque(maxlen=20)  # Window for the MA5/MA20 columns
+        
+        # Rows are queued here and appended to disk in batches by the flush thread
+        self.flush_interval = 1.0  # seconds
+        self.tail_block_size = 64 * 1024  # Initial bytes read from the end of a log
+        self._match_buf = deque()
+        self._price_buf = deque()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
         
         # Initialize CSV files with headers if they don't exist
         self._init_csv_files()
+        self._price_rows_on_disk = self._count_rows(self.prices_file)
+        
+        # In-memory mirrors of the newest rows; recent reads are served from here
+        self._mirrors = {
+            self.matches_file: self._load_mirror(self.matches_file, self.MATCH_COLUMNS),
+            self.prices_file: self._load_mirror(self.prices_file, self.PRICE_COLUMNS)
+        }
+        self._columns = {
+            self.matches_file: self.MATCH_COLUMNS,
+            self.prices_file: self.PRICE_COLUMNS
+        }
+        
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.close)
     
     def _init_csv_files(self):
-        """Initialize CSV files with headers"""
+        """Open both CSV files for appending, writing headers to new files"""
         # Matches file
-        if not os.path.exists(self.matches_file):
-            with open(self.matches_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 'buy_id', 'sell_id', 'match_amount', 'match_price',
-                    'buy_price', 'sell_price', 'spread', 'total_usdc', 'jupiter_price',
-                    'otc_vs_jupiter_spread'
-                ])
+        self._matches_fd, _ = self._open_log(self.matches_file, self.MATCH_COLUMNS)
         
         # Prices file
-        if not os.path.exists(self.prices_file):
-            with open(self.prices_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp', 'jupiter_price', 'input_amount', 'output_amount',
-                    'price_impact_pct', 'route_count'
-                ])
+        self._prices_fd, is_new = self._open_log(self.prices_file, self.PRICE_COLUMNS)
+        if not is_new:
+            self._init_moving_averages()
+    
+    def _open_log(self, path: str, columns: List[str]) -> Tuple:
+        """
+        Open a log file once for the logger's lifetime
+        
+        Args:
+            path: CSV file to open in append mode
+            columns: Header row written when the file is empty
+            
+        Returns:
+            Tuple of (file descriptor, True if the header was just written)
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        is_new = os.fstat(fd).st_size == 0
+        if is_new:
+            os.write(fd, self._encode_row(columns))
+        return fd, is_new
+    
+    @staticmethod
+    def _encode_row(fields) -> bytes:
+        """Format one CSV row as bytes, matching csv.writer's output"""
+        values = ['' if v is None else str(v) for v in fields]
+        # Fast path for plain numbers and timestamps; csv.writer handles anything needing quotes
+        if any(c in v for v in values for c in ',"\r\n'):
+            out = io.StringIO()
+            csv.writer(out).writerow(fields)
+            return out.getvalue().encode()
+        return (','.join(values) + '\r\n').encode()
+    
+    def _init_moving_averages(self):
+        """Seed the MA window from the tail of the price log, adding MA columns to older logs once"""
+        try:
+            with open(self.prices_file, 'rb') as f:
+                header = f.readline().decode().strip().split(',')
+            if 'ma20' not in header:
+                self._add_ma_columns()
+            
+            # Only the last 20 prices feed the window, so read just the tail
+            tail = pd.read_csv(io.BytesIO(self._read_tail(self.prices_file, self.recent_prices.maxlen)),
+                               usecols=['jupiter_price'])
+            self.recent_prices.extend(tail['jupiter_price'])
+        except Exception as e:
+            print(f"Error initializing moving averages: {e}")
+    
+    def _add_ma_columns(self):
+        """One-time migration of a price log written before the ma5/ma20 columns existed"""
+        # Read every field as text so existing values are written back exactly as they were
+        df = pd.read_csv(self.prices_file, dtype=str, keep_default_na=False)
+        prices = pd.to_numeric(df['jupiter_price'], errors='coerce')
+        df['ma5'] = prices.rolling(window=5, min_periods=1).mean()
+        df['ma20'] = prices.rolling(window=20, min_periods=1).mean()
+        df.to_csv(self.prices_file, index=False, lineterminator='\r\n')
+    
+    def _load_mirror(self, path: str, columns: List[str]) -> Optional[deque]:
+        """
+        Bootstrap the in-memory mirror of a log from the tail of its CSV file
+        
+        Args:
+            path: CSV file to read
+            columns: Expected column order
+            
+        Returns:
+            Deque of row tuples, or None if the file cannot be mirrored
+        """
+        try:
+            df = self._read_disk(path, self.MIRROR_SIZE, None)
+            if len(df.columns) and list(df.columns) != columns:
+                return None
+            
+            mirror = deque(maxlen=self.MIRROR_SIZE)
+            mirror.extend(df.itertuples(index=False, name=None))
+            return mirror
+        except Exception as e:
+            print(f"Error loading {path} into memory: {e}")
+            return None
+    
+    def _mirror_append(self, path: str, row: tuple):
+        """Append a logged row to the in-memory mirror of its file"""
+        mirror = self._mirrors.get(path)
+        if mirror is not None:
+            with self.lock:
+                mirror.append(row)
     
     def log_match(self, match_data: Dict, jupiter_price: Optional[float] = None):
         """
@@ -46,30 +162,31 @@ class CSVLogger:
             match_data: Match data dictionary
             jupiter_price: Current Jupiter price for comparison
         """
-        with self.lock:
-            try:
-                # Calculate OTC vs Jupiter spread if Jupiter price is provided
-                otc_vs_jupiter_spread = None
-                if jupiter_price:
-                    otc_vs_jupiter_spread = ((match_data['match_price'] - jupiter_price) / jupiter_price) * 100
-                
-                with open(self.matches_file, 'a', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        match_data['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
-                        match_data['buy_id'],
-                        match_data['sell_id'],
-                        match_data['match_amount'],
-                        match_data['match_price'],
-                        match_data['buy_price'],
-                        match_data['sell_price'],
-                        match_data['spread'],
-                        match_data['total_usdc'],
-                        jupiter_price,
-                        otc_vs_jupiter_spread
-                    ])
-            except Exception as e:
-                print(f"Error logging match: {e}")
+        try:
+            # Calculate OTC vs Jupiter spread if Jupiter price is provided
+            otc_vs_jupiter_spread = None
+            if jupiter_price:
+                otc_vs_jupiter_spread = ((match_data['match_price'] - jupiter_price) / jupiter_price) * 100
+            
+            timestamp = match_data['timestamp'].replace(microsecond=0)
+            row = (
+                timestamp,
+                match_data['buy_id'],
+                match_data['sell_id'],
+                match_data['match_amount'],
+                match_data['match_price'],
+                match_data['buy_price'],
+                match_data['sell_price'],
+                match_data['spread'],
+                match_data['total_usdc'],
+                jupiter_price,
+                otc_vs_jupiter_spread
+            )
+            
+            self._match_buf.append(self._encode_row([timestamp.strftime(self.TIMESTAMP_FORMAT), *row[1:]]))
+            self._mirror_append(self.matches_file, row)
+        except Exception as e:
+            print(f"Error logging match: {e}")
     
     def log_jupiter_price(self, price_data: Dict):
         """
@@ -80,19 +197,102 @@ class CSVLogger:
         """
         with self.lock:
             try:
-                with open(self.prices_file, 'a', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        price_data['price'],
-                        price_data['input_amount'],
-                        price_data['output_amount'],
-                        price_data.get('price_impact_pct', 0),
-                        len(price_data.get('route_plan', []))
-                    ])
+                # Update the moving averages incrementally instead of on every chart render
+                self.recent_prices.append(price_data['price'])
+                window = list(self.recent_prices)
+                ma5 = sum(window[-5:]) / len(window[-5:])
+                ma20 = sum(window) / len(window)
+                
+                timestamp = datetime.now().replace(microsecond=0)
+                row = (
+                    timestamp,
+                    price_data['price'],
+                    price_data['input_amount'],
+                    price_data['output_amount'],
+                    price_data.get('price_impact_pct', 0),
+                    len(price_data.get('route_plan', [])),
+                    ma5,
+                    ma20
+                )
+                
+                self._price_buf.append(self._encode_row([timestamp.strftime(self.TIMESTAMP_FORMAT), *row[1:]]))
+                mirror = self._mirrors.get(self.prices_file)
+                if mirror is not None:
+                    mirror.append(row)
             except Exception as e:
                 print(f"Error logging Jupiter price: {e}")
     
+    def flush(self):
+        """Append all queued match and price rows to their CSV files"""
+        with self._flush_lock:
+            for path, fd, buf in ((self.matches_file, self._matches_fd, self._match_buf),
+                                  (self.prices_file, self._prices_fd, self._price_buf)):
+                if fd is None:
+                    continue  # Logger closed
+                rows = [buf.popleft() for _ in range(len(buf))]
+                if not rows:
+                    continue
+                try:
+                    # Rows are pre-encoded, so a batch is a single write
+                    data = memoryview(b''.join(rows))
+                    while data:
+                        data = data[os.write(fd, data):]
+                    if fd == self._prices_fd:
+                        self._price_rows_on_disk += len(rows)
+                except Exception as e:
+                    print(f"Error flushing {path}: {e}")
+    
+    def _flush_loop(self):
+        """Background loop flushing queued rows every flush_interval seconds"""
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+            if self._price_rows_on_disk >= self.ROLLOVER_ROWS:
+                self._rollover()
+    
+    def _shard_paths(self, path: str) -> List[str]:
+        """Rolled-over shards of a log file, oldest first"""
+        return sorted(glob.glob(f"{os.path.splitext(path)[0]}_*.csv.gz"))
+    
+    def _count_rows(self, path: str) -> int:
+        """Count data rows in a CSV file by scanning for newlines"""
+        try:
+            with open(path, 'rb') as f:
+                return max(sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b'')) - 1, 0)
+        except OSError:
+            return 0
+    
+    def _rollover(self):
+        """Move the price CSV rows into a gzip-compressed CSV shard, prune old shards and truncate the CSV"""
+        with self._flush_lock:
+            try:
+                if self._price_rows_on_disk:
+                    # Compress the file as written (header included); no parsing needed
+                    shard = f"{os.path.splitext(self.prices_file)[0]}_{datetime.now():%Y%m%d_%H%M%S}.csv.gz"
+                    with open(self.prices_file, 'rb') as src, gzip.open(shard, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    
+                    for old in self._shard_paths(self.prices_file)[:-self.MAX_SHARDS]:
+                        os.remove(old)
+                
+                os.ftruncate(self._prices_fd, 0)
+                os.write(self._prices_fd, self._encode_row(self.PRICE_COLUMNS))
+                self._price_rows_on_disk = 0
+            except Exception as e:
+                print(f"Error rolling over price log: {e}")
+    
+    def close(self):
+        """Stop the flush thread, write any remaining rows and close the log files (safe to call twice)"""
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+        
+        with self._flush_lock:
+            for fd in (self._matches_fd, self._prices_fd):
+                if fd is not None:
+                    os.close(fd)
+            # Cleared so a later flush cannot write to a reused descriptor number
+            self._matches_fd = self._prices_fd = None
+    
     def log_offer_comparison(self, offer_data: Dict, jupiter_price: float):
         """
         Log offer vs Jupiter price comparison
@@ -105,44 +305,152 @@ class CSVLogger:
         # For now, we'll use the existing price logging
         pass
     
-    def get_recent_matches(self, limit: int = 50) -> pd.DataFrame:
+    def get_file_signature(self) -> Tuple:
+        """
+        Get a cheap fingerprint of the log files for cache invalidation
+        
+        Returns:
+            Tuple of (mtime_ns, size) per log file, None for missing files
+        """
+        self.flush()
+        signature = []
+        for path in (self.matches_file, self.prices_file):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _read_recent(self, path: str, limit: int, columns: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Read the most recent rows of a log file, newest first
+        
+        Args:
+            path: CSV file to read
+            limit: Maximum number of rows to return
+            columns: Columns to load (timestamp is always included), None for all
+            
+        Returns:
+            DataFrame with parsed timestamps
+        """
+        usecols = None
+        if columns is not None:
+            wanted = set(columns) | {'timestamp'}
+            usecols = lambda c: c in wanted
+        
+        # Serve from memory when the mirror holds the requested rows (or the whole log)
+        mirror = self._mirrors.get(path)
+        if mirror is not None and (len(mirror) >= limit or len(mirror) < mirror.maxlen):
+            with self.lock:
+                rows = list(mirror)[-limit:] if limit > 0 else []
+            if not rows:
+                return pd.DataFrame()
+            df = pd.DataFrame(rows, columns=self._columns[path])
+            if usecols is not None:
+                df = df[[c for c in df.columns if usecols(c)]]
+            return df.iloc[::-1]
+        
+        self.flush()
+        df = self._read_disk(path, limit, usecols)
+        if df.empty:
+            return pd.DataFrame()
+        # Rows are appended chronologically, so reversing gives newest first without a sort
+        return df.iloc[::-1]
+    
+    def _read_disk(self, path: str, limit: int, usecols) -> pd.DataFrame:
+        """
+        Read the last rows of a log from its CSV tail, topped up from rolled-over shards
+        
+        Args:
+            path: CSV file to read
+            limit: Maximum number of rows to return
+            usecols: Column filter passed to pandas, None for all
+            
+        Returns:
+            DataFrame in file order (oldest first)
+        """
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        
+        df = pd.read_csv(io.BytesIO(self._read_tail(path, limit)), usecols=usecols,
+                         parse_dates=['timestamp'], date_format=self.TIMESTAMP_FORMAT)
+        
+        # Older rows live in the shards, newest shard last
+        frames = [df]
+        missing = limit - len(df)
+        for shard in reversed(self._shard_paths(path)):
+            if missing <= 0:
+                break
+            shard_df = pd.read_csv(shard, compression='gzip', usecols=usecols,
+                                   parse_dates=['timestamp'], date_format=self.TIMESTAMP_FORMAT)
+            frames.insert(0, shard_df.tail(missing))
+            missing -= len(frames[0])
+        
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else df
+    
+    def _read_tail(self, path: str, limit: int) -> bytes:
+        """
+        Read the header and the last rows of a CSV file without scanning all of it
+        
+        Args:
+            path: CSV file to read
+            limit: Number of trailing rows to keep
+            
+        Returns:
+            CSV bytes with the header line followed by at most limit rows
+        """
+        with open(path, 'rb') as f:
+            header = f.readline()
+            data_start = f.tell()
+            size = f.seek(0, os.SEEK_END)
+            
+            # Grow the window from the end until it holds enough complete lines
+            block = self.tail_block_size
+            while True:
+                start = max(data_start, size - block)
+                f.seek(start)
+                lines = f.read(size - start).splitlines(keepends=True)
+                if start > data_start:
+                    lines = lines[1:]  # First line may be cut mid-row
+                if len(lines) >= limit or start == data_start:
+                    break
+                block *= 2
+        
+        return header + b''.join(lines[-limit:] if limit > 0 else [])
+    
+    def get_recent_matches(self, limit: int = 50, 
+                           columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Get recent matches from CSV
         
         Args:
             limit: Maximum number of matches to return
+            columns: Optional subset of columns to load
             
         Returns:
             DataFrame with recent matches
         """
         try:
-            if os.path.exists(self.matches_file):
-                df = pd.read_csv(self.matches_file)
-                if not df.empty:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
-                    return df.tail(limit).sort_values('timestamp', ascending=False)
-            return pd.DataFrame()
+            return self._read_recent(self.matches_file, limit, columns)
         except Exception as e:
             print(f"Error reading matches: {e}")
             return pd.DataFrame()
     
-    def get_recent_price_logs(self, limit: int = 100) -> pd.DataFrame:
+    def get_recent_price_logs(self, limit: int = 100, 
+                              columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Get recent price logs from CSV
         
         Args:
             limit: Maximum number of price logs to return
+            columns: Optional subset of columns to load
             
         Returns:
             DataFrame with recent price logs
         """
         try:
-            if os.path.exists(self.prices_file):
-                df = pd.read_csv(self.prices_file)
-                if not df.empty:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
-                    return df.tail(limit).sort_values('timestamp', ascending=False)
-            return pd.DataFrame()
+            return self._read_recent(self.prices_file, limit, columns)
         except Exception as e:
             print(f"Error reading price logs: {e}")
             return pd.DataFrame()
@@ -154,16 +462,21 @@ class CSVLogger:
             if df.empty:
                 return {}
             
+            # One aggregation pass per column instead of a separate reduction per statistic
+            agg = df[['match_amount', 'total_usdc', 'match_price', 'spread']].agg(['sum', 'mean', 'max', 'min'])
+            today = np.datetime64(datetime.now().date())
+            today_mask = df['timestamp'].to_numpy().astype('datetime64[D]') == today
+            
             stats = {
                 'total_matches': len(df),
-                'total_volume_sol': df['match_amount'].sum(),
-                'total_volume_usdc': df['total_usdc'].sum(),
-                'avg_match_price': df['match_price'].mean(),
-                'avg_spread': df['spread'].mean(),
+                'total_volume_sol': agg.at['sum', 'match_amount'],
+                'total_volume_usdc': agg.at['sum', 'total_usdc'],
+                'avg_match_price': agg.at['mean', 'match_price'],
+                'avg_spread': agg.at['mean', 'spread'],
                 'avg_otc_vs_jupiter_spread': df['otc_vs_jupiter_spread'].mean() if 'otc_vs_jupiter_spread' in df.columns else None,
-                'max_spread': df['spread'].max(),
-                'min_spread': df['spread'].min(),
-                'matches_today': len(df[df['timestamp'].dt.date == datetime.now().date()])
+                'max_spread': agg.at['max', 'spread'],
+                'min_spread': agg.at['min', 'spread'],
+                'matches_today': int(today_mask.sum())
             }
             
             return stats
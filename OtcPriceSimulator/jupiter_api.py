@@ -1,9 +1,25 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
-from typing import Dict, Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 import streamlit as st
 
+_LAMPORTS = 10**9  # lamports per SOL
+_USDC_UNITS = 10**6  # micro units per USDC
+
+def _parse_price_impact(raw) -> float:
+    """Coerce Jupiter's priceImpactPct (number, numeric string or '0.1%') to float"""
+    if not raw:
+        return 0.0
+    try:
+        return float(raw.replace('%', '') if isinstance(raw, str) else raw)
+    except (TypeError, ValueError):
+        return 0.0
+
 class JupiterAPI:
     """Jupiter API client for fetching SOL/USDC quotes"""
     
@@ -11,11 +27,35 @@ class JupiterAPI:
         self.base_url = "https://quote-api.jup.ag/v6"
         self.sol_mint = "So11111111111111111111111111111111111111112"  # SOL mint address
         self.usdc_mint = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC mint address
+        # Fixed part of every SOL/USDC quote request; only the amount changes per call
+        self._quote_params = {
+            'inputMint': self.sol_mint,
+            'outputMint': self.usdc_mint,
+            'slippageBps': 50,  # 0.5% slippage
+            'onlyDirectRoutes': 'false',
+            'asLegacyTransaction': 'false'
+        }
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'OTC-Simulator/1.0',
             'Accept': 'application/json'
         })
+        # Keep-alive pool sized for the quote workers plus the monitor thread, one pool per host
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        # Worker pool for fanning out independent quote requests
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="jupiter-api")
+        # Short-lived quote cache: (amount, slippage_bps) -> (monotonic time, quote)
+        self.quote_ttl = 2.0  # seconds
+        self._quote_cache = {}
+        self._quote_lock = threading.Lock()
+        # Last CoinGecko markets snapshot as (monotonic time, data); it only updates about once a minute
+        self.market_ttl = 60.0  # seconds
+        self._market_cache = None
     
     def get_sol_usdc_quote(self, amount: float = 1.0) -> Optional[Dict]:
         """
@@ -27,22 +67,35 @@ class JupiterAPI:
         Returns:
             Dict with quote data or None if failed
         """
-        try:
-            # Convert SOL amount to lamports (1 SOL = 1e9 lamports)
-            input_amount = int(amount * 1e9)
+        quote, error = self._fetch_quote(amount)
+        if error:
+            st.error(error)
+        return quote
+    
+    def _fetch_quote(self, amount: float) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Fetch a SOL to USDC quote without touching the UI, so it can run on worker threads
+        
+        Args:
+            amount: Amount of SOL to quote
             
-            params = {
-                'inputMint': self.sol_mint,
-                'outputMint': self.usdc_mint,
-                'amount': input_amount,
-                'slippageBps': 50,  # 0.5% slippage
-                'onlyDirectRoutes': 'false',
-                'asLegacyTransaction': 'false'
-            }
+        Returns:
+            Tuple of (quote dict or None, error message or None)
+        """
+        # Quotes for the same size barely move within a couple of seconds
+        key = (round(amount, 6), 50)
+        with self._quote_lock:
+            cached = self._quote_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.quote_ttl:
+            return cached[1], None
+        
+        try:
+            # Convert SOL amount to lamports; round so e.g. 8.2 SOL is not truncated to 8199999999
+            input_amount = int(round(amount * _LAMPORTS))
             
             response = self.session.get(
                 f"{self.base_url}/quote",
-                params=params,
+                params={**self._quote_params, 'amount': input_amount},
                 timeout=10
             )
             
@@ -51,36 +104,40 @@ class JupiterAPI:
                 
                 # Extract the output amount (in USDC micro units)
                 out_amount = int(data['outAmount'])
-                # Convert to USDC (1 USDC = 1e6 micro units)
-                usdc_amount = out_amount / 1e6
+                # Convert to USDC from micro units
+                usdc_amount = out_amount / _USDC_UNITS
                 
                 # Calculate price per SOL
                 price_per_sol = usdc_amount / amount
                 
-                return {
+                quote = {
                     'price': price_per_sol,
                     'input_amount': amount,
                     'output_amount': usdc_amount,
                     'route_plan': data.get('routePlan', []),
-                    'price_impact_pct': data.get('priceImpactPct', 0),
+                    'price_impact_pct': _parse_price_impact(data.get('priceImpactPct')),
                     'timestamp': time.time()
                 }
+                
+                now = time.monotonic()
+                with self._quote_lock:
+                    # Drop expired entries so arbitrary order sizes don't grow the cache
+                    if len(self._quote_cache) >= 256:
+                        self._quote_cache = {k: v for k, v in self._quote_cache.items()
+                                             if now - v[0] < self.quote_ttl}
+                    self._quote_cache[key] = (now, quote)
+                return quote, None
             else:
-                st.error(f"Jupiter API error: {response.status_code} - {response.text}")
-                return None
+                return None, f"Jupiter API error: {response.status_code} - {response.text}"
                 
         except requests.exceptions.Timeout:
-            st.error("Jupiter API request timed out")
-            return None
+            return None, "Jupiter API request timed out"
         except requests.exceptions.RequestException as e:
-            st.error(f"Jupiter API request failed: {str(e)}")
-            return None
+            return None, f"Jupiter API request failed: {str(e)}"
         except (KeyError, ValueError) as e:
-            st.error(f"Failed to parse Jupiter API response: {str(e)}")
-            return None
+            return None, f"Failed to parse Jupiter API response: {str(e)}"
         except Exception as e:
-            st.error(f"Unexpected error fetching Jupiter quote: {str(e)}")
-            return None
+            return None, f"Unexpected error fetching Jupiter quote: {str(e)}"
     
     def get_multiple_quotes(self, amounts: list) -> Dict[float, Optional[Dict]]:
         """
@@ -92,12 +149,13 @@ class JupiterAPI:
         Returns:
             Dict mapping amounts to quote data
         """
-        quotes = {}
-        for amount in amounts:
-            quotes[amount] = self.get_sol_usdc_quote(amount)
-            # Small delay to avoid rate limiting
-            time.sleep(0.1)
-        return quotes
+        # Quotes run concurrently on the shared pool; max_workers bounds in-flight requests.
+        # Errors are reported from the calling thread: st.error on a worker has no script
+        # context and would be dropped
+        results = list(self.executor.map(self._fetch_quote, amounts))
+        for error in dict.fromkeys(error for _, error in results if error):
+            st.error(error)
+        return {amount: quote for amount, (quote, _) in zip(amounts, results)}
     
     def get_advanced_quote_with_routes(self, amount: float = 1.0) -> Optional[Dict]:
         """
@@ -110,7 +168,7 @@ class JupiterAPI:
             Dict with detailed routing and price impact data
         """
         try:
-            input_amount = int(amount * 1e9)
+            input_amount = int(round(amount * _LAMPORTS))
             
             params = {
                 'inputMint': self.sol_mint,
@@ -128,24 +186,18 @@ class JupiterAPI:
                 data = response.json()
                 
                 out_amount = int(data['outAmount'])
-                usdc_amount = out_amount / 1e6
+                usdc_amount = out_amount / _USDC_UNITS
                 price_per_sol = usdc_amount / amount
                 
-                # Extract detailed route information
-                routes = []
-                if 'routePlan' in data:
-                    for i, route in enumerate(data['routePlan']):
-                        routes.append({
-                            'step': i + 1,
-                            'swap_info': route.get('swapInfo', {}),
-                            'percent': route.get('percent', 0)
-                        })
+                # Jupiter's route plan is passed through as-is: each step already carries
+                # 'swapInfo' and 'percent', and callers enumerate it for step numbers
+                routes = data.get('routePlan') or []
                 
                 return {
                     'price': price_per_sol,
                     'input_amount': amount,
                     'output_amount': usdc_amount,
-                    'price_impact_pct': float(data.get('priceImpactPct', 0)),
+                    'price_impact_pct': _parse_price_impact(data.get('priceImpactPct')),
                     'routes': routes,
                     'route_count': len(routes),
                     'context_slot': data.get('contextSlot', 0),
@@ -193,58 +245,54 @@ class JupiterAPI:
         """
         impact_analysis = {}
         
-        for amount in amounts:
-            quote_data = self.get_advanced_quote_with_routes(amount)
+        # Request all sizes concurrently; results keep the order of amounts
+        for amount, quote_data in zip(amounts, self.executor.map(self.get_advanced_quote_with_routes, amounts)):
             if quote_data:
                 impact_analysis[amount] = quote_data['price_impact_pct']
             else:
                 impact_analysis[amount] = None
-            
-            time.sleep(0.1)  # Rate limiting
         
         return impact_analysis
     
     def get_token_prices(self) -> Optional[Dict]:
-        """Get current token prices from CoinGecko API"""
-        try:
-            # Using CoinGecko API for real-time price data
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': 'solana,usd-coin',
-                'vs_currencies': 'usd',
-                'include_24hr_change': 'true',
-                'include_market_cap': 'true',
-                'include_24hr_vol': 'true'
-            }
-            
-            response = self.session.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'solana': {
-                        'price_usd': data.get('solana', {}).get('usd', 0),
-                        'change_24h': data.get('solana', {}).get('usd_24h_change', 0),
-                        'market_cap': data.get('solana', {}).get('usd_market_cap', 0),
-                        'volume_24h': data.get('solana', {}).get('usd_24h_vol', 0)
-                    },
-                    'usdc': {
-                        'price_usd': data.get('usd-coin', {}).get('usd', 0),
-                        'change_24h': data.get('usd-coin', {}).get('usd_24h_change', 0),
-                        'market_cap': data.get('usd-coin', {}).get('usd_market_cap', 0),
-                        'volume_24h': data.get('usd-coin', {}).get('usd_24h_vol', 0)
-                    },
-                    'timestamp': time.time()
-                }
-            else:
-                return None
-                
-        except Exception as e:
-            print(f"Error fetching token prices: {e}")
+        """Get current token prices, derived from the cached CoinGecko markets data"""
+        market_data = self.get_market_data()
+        if not market_data:
             return None
-
-    def get_market_data(self) -> Optional[Dict]:
-        """Get comprehensive market data for SOL and USDC"""
+        
+        sol_data = market_data.get('solana', {})
+        usdc_data = market_data.get('usdc', {})
+        return {
+            'solana': {
+                'price_usd': sol_data.get('price', 0),
+                'change_24h': sol_data.get('change_24h', 0),
+                'market_cap': sol_data.get('market_cap', 0),
+                'volume_24h': sol_data.get('volume_24h', 0)
+            },
+            'usdc': {
+                'price_usd': usdc_data.get('price', 0),
+                'change_24h': usdc_data.get('change_24h', 0),
+                'market_cap': usdc_data.get('market_cap', 0),
+                'volume_24h': usdc_data.get('volume_24h', 0)
+            },
+            'timestamp': market_data['timestamp']
+        }
+    
+    def get_market_data(self, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Get comprehensive market data for SOL and USDC
+        
+        Args:
+            max_age: Oldest cached snapshot to accept in seconds (default: market_ttl, 0 forces a fetch)
+            
+        Returns:
+            Dict with market data or None if failed
+        """
+        max_age = self.market_ttl if max_age is None else max_age
+        cached = self._market_cache
+        if cached and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        
         try:
             # Get detailed market data
             url = "https://api.coingecko.com/api/v3/coins/markets"
@@ -292,6 +340,7 @@ class JupiterAPI:
                         }
                 
                 market_data['timestamp'] = time.time()
+                self._market_cache = (time.monotonic(), market_data)
                 return market_data
             else:
                 return None
@@ -308,7 +357,7 @@ class JupiterAPI:
                 params={
                     'inputMint': self.sol_mint,
                     'outputMint': self.usdc_mint,
-                    'amount': 1000000000,  # 1 SOL in lamports
+                    'amount': _LAMPORTS,  # 1 SOL
                     'slippageBps': 50
                 },
                 timeout=5
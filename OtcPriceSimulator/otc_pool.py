@@ -1,18 +1,75 @@
 import uuid
 import time
+import bisect
 from datetime import datetime
 from typing import List, Dict, Optional
 import threading
+import numpy as np
 
 class OTCPool:
     """OTC trading pool for managing buy/sell offers"""
     
     def __init__(self):
         self.offers = {}  # Dict to store offers by ID
-        self.active_offers = []  # List of active offer IDs
+        # Active offer IDs (dict keys keep insertion order). Invariant: every ID here is
+        # in self.offers with status ACTIVE; only add_offer and _deactivate change it.
+        self.active_offers = {}
         self.completed_offers = []  # List of completed offer IDs
         self.lock = threading.Lock()  # Thread safety
         self.next_id = 1
+        self.version = 0  # Bumped on every change to the offer set
+        # Price-sorted books of active offers: (-price, id) for buys, (price, id) for sells,
+        # so index 0 is the best offer and equal prices keep time priority
+        self._buy_sorted = []
+        self._sell_sorted = []
+        # Running aggregates over active offers, kept in step with every mutation
+        self.stats = self._empty_stats()
+        # (version, offers) list handed to readers; rebuilt at most once per version
+        self._active_snapshot = (-1, [])
+        # (version, arrays) column view of the same offers for vectorized readers
+        self._array_snapshot = (-1, None)
+    
+    @staticmethod
+    def _empty_stats() -> Dict:
+        """Zeroed running aggregates for both sides of the book"""
+        return {'buy_vol': 0.0, 'sell_vol': 0.0, 'buy_sum': 0.0, 'sell_sum': 0.0, 'buy_n': 0, 'sell_n': 0}
+    
+    def _track(self, offer: Dict, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) an offer's contribution to the running stats"""
+        if offer['type'] == 'BUY':
+            side = 'buy'
+        elif offer['type'] == 'SELL':
+            side = 'sell'
+        else:
+            return
+        
+        stats = self.stats
+        stats[f'{side}_n'] += sign
+        if stats[f'{side}_n'] == 0:
+            # Reset instead of subtracting so float error cannot accumulate
+            stats[f'{side}_vol'] = 0.0
+            stats[f'{side}_sum'] = 0.0
+        else:
+            stats[f'{side}_vol'] += sign * offer['sol_amount']
+            stats[f'{side}_sum'] += sign * offer['price_per_sol']
+    
+    def _book_entry(self, offer: Dict) -> tuple:
+        """Sorted book and sort key for an offer (None book for unknown types)"""
+        if offer['type'] == 'BUY':
+            return self._buy_sorted, (-offer['price_per_sol'], offer['id'])
+        if offer['type'] == 'SELL':
+            return self._sell_sorted, (offer['price_per_sol'], offer['id'])
+        return None, None
+    
+    def _deactivate(self, offer_id: int) -> None:
+        """Drop an offer from the active set and its sorted book"""
+        del self.active_offers[offer_id]
+        offer = self.offers[offer_id]
+        self._track(offer, -1)
+        
+        book, key = self._book_entry(offer)
+        if book is not None:
+            del book[bisect.bisect_left(book, key)]
     
     def add_offer(self, offer_type: str, sol_amount: float, price_per_sol: float, 
                   user_id: str = "anonymous") -> int:
@@ -28,6 +85,8 @@ class OTCPool:
         Returns:
             Offer ID
         """
+        created_at = time.time()
+        
         with self.lock:
             offer_id = self.next_id
             self.next_id += 1
@@ -40,12 +99,17 @@ class OTCPool:
                 'total_usdc': sol_amount * price_per_sol,
                 'user_id': user_id,
                 'status': 'ACTIVE',
-                'timestamp': datetime.now(),
-                'created_at': time.time()
+                'timestamp': datetime.fromtimestamp(created_at),
+                'created_at': created_at
             }
             
             self.offers[offer_id] = offer
-            self.active_offers.append(offer_id)
+            self.active_offers[offer_id] = None
+            book, key = self._book_entry(offer)
+            if book is not None:
+                bisect.insort(book, key)
+            self._track(offer, 1)
+            self.version += 1
             
             return offer_id
     
@@ -60,71 +124,121 @@ class OTCPool:
             True if cancelled, False if not found or already inactive
         """
         with self.lock:
-            if offer_id in self.active_offers and offer_id in self.offers:
+            if offer_id in self.active_offers:
                 self.offers[offer_id]['status'] = 'CANCELLED'
-                self.active_offers.remove(offer_id)
+                self._deactivate(offer_id)
+                self.version += 1
                 return True
             return False
     
     def get_active_offers(self) -> List[Dict]:
         """Get all active offers"""
-        with self.lock:
-            return [self.offers[offer_id] for offer_id in self.active_offers 
-                   if offer_id in self.offers]
+        # Readers share the snapshot for the current version and only take the
+        # lock to rebuild it, so the monitor's polling rarely waits on writers
+        version, offers = self._active_snapshot
+        if version != self.version:
+            with self.lock:
+                version = self.version
+                offers = [self.offers[offer_id] for offer_id in self.active_offers]
+                self._active_snapshot = (version, offers)
+        return list(offers)
+    
+    def get_offer_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get active offers as parallel NumPy arrays, rebuilt at most once per version
+        
+        Returns:
+            Dict with read-only 'ids', 'is_buy', 'prices' and 'amounts' arrays in active offer order
+        """
+        version, arrays = self._array_snapshot
+        if version != self.version:
+            # Read the version first: if a write lands in between, the arrays are
+            # newer than their label and simply get rebuilt on the next call
+            version = self.version
+            offers = self.get_active_offers()
+            n = len(offers)
+            arrays = {
+                'ids': np.fromiter((o['id'] for o in offers), dtype=np.int64, count=n),
+                'is_buy': np.fromiter((o['type'] == 'BUY' for o in offers), dtype=bool, count=n),
+                'prices': np.fromiter((o['price_per_sol'] for o in offers), dtype=np.float64, count=n),
+                'amounts': np.fromiter((o['sol_amount'] for o in offers), dtype=np.float64, count=n)
+            }
+            for arr in arrays.values():
+                arr.flags.writeable = False
+            self._array_snapshot = (version, arrays)
+        return arrays
     
     def get_offer(self, offer_id: int) -> Optional[Dict]:
         """Get specific offer by ID"""
-        with self.lock:
-            return self.offers.get(offer_id)
+        # A single dict lookup is atomic; no lock needed
+        return self.offers.get(offer_id)
     
     def get_offers_by_type(self, offer_type: str) -> List[Dict]:
-        """Get active offers by type (BUY/SELL)"""
+        """Get active offers by type (BUY/SELL), best price first"""
+        # Each side already has its own sorted book, so no scan over the other side
+        offer_type = offer_type.upper()
+        if offer_type == 'BUY':
+            book = self._buy_sorted
+        elif offer_type == 'SELL':
+            book = self._sell_sorted
+        else:
+            return []
+        
         with self.lock:
-            return [self.offers[offer_id] for offer_id in self.active_offers 
-                   if offer_id in self.offers and self.offers[offer_id]['type'] == offer_type.upper()]
+            return [self.offers[offer_id] for _, offer_id in book]
     
     def simulate_matching(self) -> List[Dict]:
         """
         Simulate order matching between buy and sell offers
         
+        Walks the book in price-time priority: the best buy is filled against the
+        best sell until one side runs out or the prices no longer cross.
+        
         Returns:
-            List of potential matches
+            List of potential matches (fills)
         """
+        matches = []
+        now = datetime.now()
+        
         with self.lock:
-            buy_offers = self.get_offers_by_type('BUY')
-            sell_offers = self.get_offers_by_type('SELL')
-            
-            matches = []
+            # The books are kept sorted, so this is a plain two-pointer walk
+            buys = self._buy_sorted
+            sells = self._sell_sorted
+            i = j = 0
+            buy_left = self.offers[buys[0][1]]['sol_amount'] if buys else 0
+            sell_left = self.offers[sells[0][1]]['sol_amount'] if sells else 0
             
-            # Sort buy offers by price (highest first)
-            buy_offers.sort(key=lambda x: x['price_per_sol'], reverse=True)
-            # Sort sell offers by price (lowest first)
-            sell_offers.sort(key=lambda x: x['price_per_sol'])
-            
-            for buy_offer in buy_offers:
-                for sell_offer in sell_offers:
-                    # Check if buy price >= sell price (potential match)
-                    if buy_offer['price_per_sol'] >= sell_offer['price_per_sol']:
-                        # Calculate match details
-                        match_amount = min(buy_offer['sol_amount'], sell_offer['sol_amount'])
-                        match_price = (buy_offer['price_per_sol'] + sell_offer['price_per_sol']) / 2
-                        spread = buy_offer['price_per_sol'] - sell_offer['price_per_sol']
-                        
-                        match = {
-                            'buy_id': buy_offer['id'],
-                            'sell_id': sell_offer['id'],
-                            'match_amount': match_amount,
-                            'match_price': match_price,
-                            'buy_price': buy_offer['price_per_sol'],
-                            'sell_price': sell_offer['price_per_sol'],
-                            'spread': spread,
-                            'total_usdc': match_amount * match_price,
-                            'timestamp': datetime.now()
-                        }
-                        
-                        matches.append(match)
-            
-            return matches
+            while i < len(buys) and j < len(sells) and -buys[i][0] >= sells[j][0]:
+                buy_price, buy_id = -buys[i][0], buys[i][1]
+                sell_price, sell_id = sells[j]
+                
+                # Calculate match details
+                match_amount = min(buy_left, sell_left)
+                match_price = (buy_price + sell_price) / 2
+                
+                matches.append({
+                    'buy_id': buy_id,
+                    'sell_id': sell_id,
+                    'match_amount': match_amount,
+                    'match_price': match_price,
+                    'buy_price': buy_price,
+                    'sell_price': sell_price,
+                    'spread': buy_price - sell_price,
+                    'total_usdc': match_amount * match_price,
+                    'timestamp': now
+                })
+                
+                # Advance whichever side was filled
+                buy_left -= match_amount
+                sell_left -= match_amount
+                if buy_left <= 0:
+                    i += 1
+                    buy_left = self.offers[buys[i][1]]['sol_amount'] if i < len(buys) else 0
+                if sell_left <= 0:
+                    j += 1
+                    sell_left = self.offers[sells[j][1]]['sol_amount'] if j < len(sells) else 0
+        
+        return matches
     
     def execute_match(self, buy_id: int, sell_id: int, match_amount: float, 
                      match_price: float) -> bool:
@@ -141,54 +255,51 @@ class OTCPool:
             True if match executed successfully
         """
         with self.lock:
-            if buy_id not in self.offers or sell_id not in self.offers:
+            if buy_id not in self.active_offers or sell_id not in self.active_offers:
                 return False
             
             buy_offer = self.offers[buy_id]
             sell_offer = self.offers[sell_id]
             
-            if (buy_offer['status'] != 'ACTIVE' or sell_offer['status'] != 'ACTIVE' or
-                buy_id not in self.active_offers or sell_id not in self.active_offers):
-                return False
-            
             # Update offer amounts
+            self.stats['buy_vol'] -= match_amount
+            self.stats['sell_vol'] -= match_amount
             buy_offer['sol_amount'] -= match_amount
             sell_offer['sol_amount'] -= match_amount
             
             # Mark as completed if fully filled
             if buy_offer['sol_amount'] <= 0:
                 buy_offer['status'] = 'COMPLETED'
-                self.active_offers.remove(buy_id)
+                self._deactivate(buy_id)
                 self.completed_offers.append(buy_id)
             
             if sell_offer['sol_amount'] <= 0:
                 sell_offer['status'] = 'COMPLETED'
-                self.active_offers.remove(sell_id)
+                self._deactivate(sell_id)
                 self.completed_offers.append(sell_id)
             
+            self.version += 1
             return True
     
     def get_pool_stats(self) -> Dict:
         """Get pool statistics"""
         with self.lock:
-            active_offers = self.get_active_offers()
-            buy_offers = [o for o in active_offers if o['type'] == 'BUY']
-            sell_offers = [o for o in active_offers if o['type'] == 'SELL']
+            stats = self.stats
+            best_buy = self._buy_sorted[0] if self._buy_sorted else None
+            best_sell = self._sell_sorted[0] if self._sell_sorted else None
             
-            stats = {
-                'total_active_offers': len(active_offers),
-                'buy_offers_count': len(buy_offers),
-                'sell_offers_count': len(sell_offers),
+            return {
+                'total_active_offers': len(self.active_offers),
+                'buy_offers_count': stats['buy_n'],
+                'sell_offers_count': stats['sell_n'],
                 'completed_offers_count': len(self.completed_offers),
-                'total_sol_buy_volume': sum(o['sol_amount'] for o in buy_offers),
-                'total_sol_sell_volume': sum(o['sol_amount'] for o in sell_offers),
-                'avg_buy_price': sum(o['price_per_sol'] for o in buy_offers) / len(buy_offers) if buy_offers else 0,
-                'avg_sell_price': sum(o['price_per_sol'] for o in sell_offers) / len(sell_offers) if sell_offers else 0,
-                'highest_buy_price': max(o['price_per_sol'] for o in buy_offers) if buy_offers else 0,
-                'lowest_sell_price': min(o['price_per_sol'] for o in sell_offers) if sell_offers else 0
+                'total_sol_buy_volume': stats['buy_vol'],
+                'total_sol_sell_volume': stats['sell_vol'],
+                'avg_buy_price': stats['buy_sum'] / stats['buy_n'] if stats['buy_n'] else 0,
+                'avg_sell_price': stats['sell_sum'] / stats['sell_n'] if stats['sell_n'] else 0,
+                'highest_buy_price': -best_buy[0] if best_buy else 0,
+                'lowest_sell_price': best_sell[0] if best_sell else 0
             }
-            
-            return stats
     
     def clear_pool(self) -> None:
         """Clear all offers from the pool"""
@@ -196,4 +307,8 @@ class OTCPool:
             self.offers.clear()
             self.active_offers.clear()
             self.completed_offers.clear()
+            self._buy_sorted.clear()
+            self._sell_sorted.clear()
+            self.stats = self._empty_stats()
             self.next_id = 1
+            self.version += 1
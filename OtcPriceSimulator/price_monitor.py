@@ -2,7 +2,7 @@ import threading
 import time
 from datetime import datetime
 from typing import Optional
-import streamlit as st
+import numpy as np
 
 class PriceMonitor:
     """Background price monitoring service"""
@@ -14,8 +14,14 @@ class PriceMonitor:
         self.monitoring_thread = None
         self.stop_event = threading.Event()
         self.polling_interval = 15  # seconds
+        self.max_polling_interval = 120  # seconds, cap for backoff while the price is flat
+        self.current_interval = self.polling_interval
+        self._consecutive_errors = 0  # Failed polls in a row, drives exponential backoff
         self.last_price = None
         self.last_update = None
+        # (price, datetime, monotonic) of the latest quote, replaced as a whole so
+        # the Streamlit script thread can read it without locking
+        self.latest_snapshot = None
     
     def start_monitoring(self, polling_interval: int = 15):
         """
@@ -28,6 +34,8 @@ class PriceMonitor:
             return  # Already running
         
         self.polling_interval = polling_interval
+        self.current_interval = polling_interval
+        self._consecutive_errors = 0
         self.stop_event.clear()
         self.monitoring_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitoring_thread.start()
@@ -46,42 +54,54 @@ class PriceMonitor:
                 price_data = self.jupiter_api.get_sol_usdc_quote(1.0)
                 
                 if price_data:
-                    # Update session state
-                    st.session_state.last_jupiter_price = price_data['price']
-                    st.session_state.last_update_time = datetime.now()
+                    if self._consecutive_errors:
+                        # Recovered from failures, resume the normal cadence
+                        self._consecutive_errors = 0
+                        self.current_interval = self.polling_interval
                     
-                    # Log to CSV
-                    self.csv_logger.log_jupiter_price(price_data)
+                    # Back off while the quote is unchanged, reset as soon as it moves
+                    unchanged = (self.last_price is not None and
+                                 round(price_data['price'], 4) == round(self.last_price, 4))
+                    if unchanged:
+                        self.current_interval = min(self.current_interval * 1.5, self.max_polling_interval)
+                    else:
+                        self.current_interval = self.polling_interval
+                    
+                    # One clock read per tick, shared by the snapshot and last_update; the
+                    # script thread copies the snapshot into its session state on each rerun
+                    _, updated_at, _ = self._publish_price(price_data['price'])
+                    
+                    # Log to CSV, skipping repeats of an unchanged price
+                    if not unchanged:
+                        self.csv_logger.log_jupiter_price(price_data)
                     
                     # Store locally
                     self.last_price = price_data['price']
-                    self.last_update = datetime.now()
+                    self.last_update = updated_at
                     
                     # Check for arbitrage opportunities
                     self._check_arbitrage_opportunities(price_data['price'])
-                
-                # Fetch market data every 5th cycle (less frequent)
-                if hasattr(self, '_market_cycle_count'):
-                    self._market_cycle_count += 1
                 else:
-                    self._market_cycle_count = 1
-                    
-                if self._market_cycle_count % 5 == 0:
-                    try:
-                        market_data = self.jupiter_api.get_market_data()
-                        if market_data:
-                            st.session_state.market_data = market_data
-                            st.session_state.last_market_update = datetime.now()
-                    except Exception as e:
-                        print(f"Error fetching market data: {e}")
+                    # Quote failed (rate limited, 5xx or timeout): back off instead of
+                    # retrying at the same cadence
+                    self.current_interval = self._error_backoff()
+                
+                # Keep the JupiterAPI market memo warm (one CoinGecko call per market_ttl);
+                # the UI picks the snapshot up through render_market_data
+                self.jupiter_api.get_market_data()
                 
                 # Wait for next update
-                self.stop_event.wait(self.polling_interval)
+                self.stop_event.wait(self.current_interval)
                 
             except Exception as e:
                 print(f"Error in price monitoring: {e}")
-                # Wait before retrying
-                self.stop_event.wait(min(self.polling_interval, 30))
+                # Wait before retrying, longer after each consecutive failure
+                self.stop_event.wait(self._error_backoff())
+    
+    def _error_backoff(self) -> float:
+        """Count a failed poll and return the doubled wait, capped at max_polling_interval"""
+        self._consecutive_errors += 1
+        return min(self.polling_interval * 2 ** self._consecutive_errors, self.max_polling_interval)
     
     def _check_arbitrage_opportunities(self, jupiter_price: float):
         """
@@ -91,45 +111,56 @@ class PriceMonitor:
             jupiter_price: Current Jupiter price
         """
         try:
-            active_offers = self.otc_pool.get_active_offers()
+            # Empty book: nothing to compare, skip building arrays
+            if not self.otc_pool.active_offers:
+                return
             
-            for offer in active_offers:
-                spread_pct = self._calculate_spread_percentage(
-                    offer['type'], offer['price_per_sol'], jupiter_price
-                )
+            offers = self.otc_pool.get_offer_arrays()
+            spread_pct = self._calculate_spread_percentage(offers['is_buy'], offers['prices'], jupiter_price)
+            
+            # Flag significant arbitrage opportunities (>1% spread); most ticks have none
+            hits = np.flatnonzero(np.abs(spread_pct) > 1.0)
+            if hits.size == 0:
+                return
+            
+            now = datetime.now()
+            for i in hits:
+                opportunity = {
+                    'offer_id': int(offers['ids'][i]),
+                    'offer_type': 'BUY' if offers['is_buy'][i] else 'SELL',
+                    'otc_price': float(offers['prices'][i]),
+                    'jupiter_price': jupiter_price,
+                    'spread_pct': float(spread_pct[i]),
+                    'sol_amount': float(offers['amounts'][i]),
+                    'timestamp': now
+                }
                 
-                # Flag significant arbitrage opportunities (>1% spread)
-                if abs(spread_pct) > 1.0:
-                    opportunity = {
-                        'offer_id': offer['id'],
-                        'offer_type': offer['type'],
-                        'otc_price': offer['price_per_sol'],
-                        'jupiter_price': jupiter_price,
-                        'spread_pct': spread_pct,
-                        'sol_amount': offer['sol_amount'],
-                        'timestamp': datetime.now()
-                    }
-                    
-                    # Log opportunity (could be extended to send alerts)
-                    self._log_arbitrage_opportunity(opportunity)
+                # Log opportunity (could be extended to send alerts)
+                self._log_arbitrage_opportunity(opportunity)
         
         except Exception as e:
             print(f"Error checking arbitrage opportunities: {e}")
     
-    def _calculate_spread_percentage(self, offer_type: str, otc_price: float, jupiter_price: float) -> float:
-        """Calculate spread percentage based on offer type"""
-        if offer_type == 'BUY':
-            # For buy offers, positive spread means OTC price is higher
-            return ((otc_price - jupiter_price) / jupiter_price) * 100
-        else:  # SELL
-            # For sell offers, positive spread means Jupiter price is higher (OTC is cheaper)
-            return ((jupiter_price - otc_price) / jupiter_price) * 100
+    def _calculate_spread_percentage(self, is_buy: np.ndarray, otc_prices: np.ndarray, jupiter_price: float) -> np.ndarray:
+        """Calculate spread percentages for a batch of offers based on offer type"""
+        # For buy offers, positive spread means OTC price is higher;
+        # for sell offers, positive spread means Jupiter price is higher (OTC is cheaper)
+        return np.where(is_buy, otc_prices - jupiter_price, jupiter_price - otc_prices) / jupiter_price * 100
     
     def _log_arbitrage_opportunity(self, opportunity: dict):
         """Log arbitrage opportunity"""
         # This could be extended to maintain a separate log file for opportunities
         print(f"Arbitrage opportunity: {opportunity}")
     
+    def _publish_price(self, price: float) -> tuple:
+        """Publish the latest price snapshot for readers on other threads and return it"""
+        self.latest_snapshot = (price, datetime.now(), time.monotonic())
+        return self.latest_snapshot
+    
+    def get_latest_snapshot(self) -> Optional[tuple]:
+        """Get the latest (price, datetime, monotonic) snapshot, or None before the first quote"""
+        return self.latest_snapshot
+    
     def get_current_price(self) -> Optional[float]:
         """Get the last fetched price"""
         return self.last_price
@@ -145,15 +176,14 @@ class PriceMonitor:
         return False
     
     def force_price_update(self) -> Optional[float]:
-        """Force an immediate price update"""
+        """Force an immediate price update; the caller stores the returned price in its session"""
         try:
             price_data = self.jupiter_api.get_sol_usdc_quote(1.0)
             if price_data:
-                st.session_state.last_jupiter_price = price_data['price']
-                st.session_state.last_update_time = datetime.now()
+                _, updated_at, _ = self._publish_price(price_data['price'])
                 self.csv_logger.log_jupiter_price(price_data)
                 self.last_price = price_data['price']
-                self.last_update = datetime.now()
+                self.last_update = updated_at
                 return price_data['price']
             return None
         except Exception as e:
@@ -1,35 +1,226 @@
+import functools
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class RSIState:
+    """Incremental Wilder RSI: feed one price at a time, O(1) per update"""
+    period: int = 14
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    prev: Optional[float] = None
+    count: int = 0  # Price changes seen so far
+    
+    def update(self, price: float) -> float:
+        """
+        Add the next price and return the current RSI
+        
+        Args:
+            price: Latest price
+            
+        Returns:
+            RSI value (50 until `period` price changes have been seen)
+        """
+        if self.prev is None or np.isnan(price):
+            if self.prev is None and not np.isnan(price):
+                self.prev = price
+            return self.value()
+        
+        delta = price - self.prev
+        self.prev = price
+        # Branch-free split of the change into gain and loss (exact: doubling and halving are lossless)
+        abs_delta = abs(delta)
+        gain = 0.5 * (abs_delta + delta)
+        loss = 0.5 * (abs_delta - delta)
+        
+        self.count += 1
+        if self.count <= self.period:
+            # Seed with the simple average of the first `period` changes
+            self.avg_gain += (gain - self.avg_gain) / self.count
+            self.avg_loss += (loss - self.avg_loss) / self.count
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return self.value()
+    
+    def value(self) -> float:
+        """Current RSI without consuming a price"""
+        if self.count < self.period or (self.avg_gain == 0 and self.avg_loss == 0):
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+def _wilder_rsi(prices: np.ndarray, period: int) -> np.ndarray:
+    """
+    Batch Wilder RSI over finite prices, matching RSIState.update step for step
+    
+    Args:
+        prices: Array of prices without NaNs
+        period: Period for RSI calculation
+        
+    Returns:
+        Array of RSI values (50 during the warm-up period)
+    """
+    out = np.full(len(prices), 50.0)
+    if len(prices) <= period:
+        return out
+    
+    delta = np.diff(prices)
+    
+    def smooth(x: np.ndarray) -> np.ndarray:
+        # Seed with the simple average of the first `period` changes, then Wilder's
+        # recursion avg = (avg * (period - 1) + x) / period, i.e. an EWM with alpha = 1/period
+        seeded = np.concatenate(([x[:period].mean()], x[period:]))
+        return pd.Series(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+    
+    # Split changes into gains and losses from one abs pass instead of two masked copies
+    abs_delta = np.abs(delta)
+    avg_gain = smooth(0.5 * (abs_delta + delta))
+    avg_loss = smooth(0.5 * (abs_delta - delta))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[avg_loss == 0] = 100.0
+    rsi[(avg_gain == 0) & (avg_loss == 0)] = 50.0
+    out[period:] = rsi
+    return out
+
+def _rolling_mean_std(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample standard deviation, each computed from its own window
+    
+    Args:
+        x: Array of values (NaNs allowed)
+        window: Rolling window size
+        
+    Returns:
+        Tuple of (mean, std) arrays; NaN until the window fills or where it contains a NaN
+    """
+    n = len(x)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if n < window:
+        return mean, std
+    
+    # Strided (n - window + 1, window) view, no copy; at indicator window sizes the per-window
+    # reductions are cheap and, unlike differences of running sums, carry no drift between windows
+    windows = np.lib.stride_tricks.sliding_window_view(x, window)
+    win_mean = windows.mean(axis=1)
+    # Sample std (ddof=1, as pandas rolling std)
+    win_std = windows.std(axis=1, ddof=1) if window > 1 else np.zeros(len(windows))
+    
+    # Flat windows are reported exactly, as pandas rolling does: mean is the price itself and
+    # std is 0, so an unchanged price sits on its bands and never outside them
+    flat = windows.min(axis=1) == windows.max(axis=1)
+    win_mean[flat] = windows[flat, 0]
+    win_std[flat] = 0.0
+    
+    mean[window - 1:] = win_mean
+    std[window - 1:] = win_std
+    return mean, std
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean computed from each window's own values, exact on flat windows like _rolling_mean_std"""
+    mean = np.full(len(x), np.nan)
+    if len(x) < window:
+        return mean
+    
+    windows = np.lib.stride_tricks.sliding_window_view(x, window)
+    win_mean = windows.mean(axis=1)
+    flat = windows.min(axis=1) == windows.max(axis=1)
+    win_mean[flat] = windows[flat, 0]
+    mean[window - 1:] = win_mean
+    return mean
+
+def _nan_mean_std(x: np.ndarray) -> Tuple[float, float]:
+    """Mean and sample standard deviation of the non-NaN values (NaN when undefined), as pandas reports them"""
+    x = x[~np.isnan(x)]
+    mean = x.mean() if len(x) else np.nan
+    std = x.std(ddof=1) if len(x) > 1 else np.nan
+    return mean, std
+
+def _cached_on_prices(method):
+    """Memoize a TechnicalAnalyzer method on the identity, length and last value of its price Series"""
+    @functools.wraps(method)
+    def wrapper(self, prices, *args, **kwargs):
+        last = float(prices.iat[-1]) if len(prices) else None
+        # Each NaN is a distinct key object, so a NaN last price would never hit; fold it to None
+        if last != last:
+            last = None
+        key = (method.__name__, id(prices), len(prices), last, args, tuple(sorted(kwargs.items())))
+        cached = self._cache.get(key)
+        # The entry holds the Series itself, so its id cannot be reused while cached
+        if cached is not None and cached[0] is prices:
+            return cached[1]
+        
+        result = method(self, prices, *args, **kwargs)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = (prices, result)
+        return result
+    return wrapper
 
 class TechnicalAnalyzer:
     """Technical analysis and statistical calculations for price data"""
     
     def __init__(self):
-        pass
+        # Per-tick memo for indicators several helpers recompute on the same Series; one tick
+        # needs the four memoized methods on a Series or two, and the shared analyzer keeps
+        # every cached Series alive, so stay small
+        self.cache_size = 8
+        self._cache = {}
+    
+    def clear_cache(self):
+        """Drop memoized indicator results (e.g. after mutating a Series in place)"""
+        self._cache.clear()
     
+    @_cached_on_prices
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """
-        Calculate Relative Strength Index (RSI)
+        Calculate Relative Strength Index (RSI) with Wilder smoothing
         
         Args:
             prices: Series of prices
             period: Period for RSI calculation
             
         Returns:
-            Series with RSI values
+            Series with RSI values (50 during the warm-up period)
         """
-        if len(prices) < period + 1:
-            return pd.Series([50] * len(prices), index=prices.index)
+        arr = prices.to_numpy(dtype=np.float64)
+        finite = ~np.isnan(arr)
+        if finite.all():
+            values = _wilder_rsi(arr, period)
+        else:
+            # Like RSIState, skip missing prices and hold the previous reading
+            values = np.full(len(arr), np.nan)
+            values[finite] = _wilder_rsi(arr[finite], period)
+            values = pd.Series(values).ffill().fillna(50.0).to_numpy()
         
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        return pd.Series(values, index=prices.index)
+    
+    def calculate_rsi_last(self, prices: np.ndarray, period: int = 14) -> float:
+        """
+        Calculate only the most recent RSI value, the same reading as calculate_rsi(prices).iloc[-1]
         
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.fillna(50) if hasattr(rsi, 'fillna') else pd.Series([50] * len(prices), index=prices.index)
+        Args:
+            prices: Array of prices
+            period: Period for RSI calculation
+            
+        Returns:
+            Latest RSI value (50 when it cannot be determined)
+        """
+        # Wilder smoothing carries the whole history, so this runs the same kernel as
+        # calculate_rsi; missing prices are skipped, as there
+        arr = np.asarray(prices, dtype=np.float64)
+        arr = arr[~np.isnan(arr)]
+        if len(arr) == 0:
+            return 50.0
+        
+        return float(_wilder_rsi(arr, period)[-1])
     
     def calculate_moving_averages(self, prices: pd.Series, 
                                 windows: List[int] = [5, 10, 20, 50]) -> Dict[str, pd.Series]:
@@ -43,14 +234,22 @@ class TechnicalAnalyzer:
         Returns:
             Dict with moving averages for each window
         """
+        arr = prices.to_numpy(dtype=np.float64)
+        fallback = None
+        
         mas = {}
         for window in windows:
             if len(prices) >= window:
-                mas[f'MA_{window}'] = prices.rolling(window=window).mean()
+                # Per-window means rather than prefix-sum differences, so an unchanged price
+                # equals its MAs exactly and the MA signal cannot fire on rounding error
+                mas[f'MA_{window}'] = pd.Series(_rolling_mean(arr, window), index=prices.index)
             else:
-                mas[f'MA_{window}'] = pd.Series([prices.mean()] * len(prices), index=prices.index)
+                if fallback is None:
+                    fallback = _nan_mean_std(arr)[0]
+                mas[f'MA_{window}'] = pd.Series(fallback, index=prices.index)
         return mas
     
+    @_cached_on_prices
     def calculate_bollinger_bands(self, prices: pd.Series, window: int = 20, 
                                 num_std: float = 2.0) -> Dict[str, pd.Series]:
         """
@@ -64,22 +263,23 @@ class TechnicalAnalyzer:
         Returns:
             Dict with upper, middle, and lower bands
         """
-        if len(prices) < window:
-            mean_price = prices.mean()
-            std_price = prices.std() if len(prices) > 1 else 0
+        arr = prices.to_numpy(dtype=np.float64)
+        if len(arr) < window:
+            mean_price, std_price = _nan_mean_std(arr)
+            std_price = std_price if len(arr) > 1 else 0
             return {
-                'upper': pd.Series([mean_price + num_std * std_price] * len(prices), index=prices.index),
-                'middle': pd.Series([mean_price] * len(prices), index=prices.index),
-                'lower': pd.Series([mean_price - num_std * std_price] * len(prices), index=prices.index)
+                'upper': pd.Series(mean_price + num_std * std_price, index=prices.index),
+                'middle': pd.Series(mean_price, index=prices.index),
+                'lower': pd.Series(mean_price - num_std * std_price, index=prices.index)
             }
         
-        rolling_mean = prices.rolling(window=window).mean()
-        rolling_std = prices.rolling(window=window).std()
+        rolling_mean, rolling_std = _rolling_mean_std(arr, window)
+        band = rolling_std * num_std
         
         return {
-            'upper': rolling_mean + (rolling_std * num_std),
-            'middle': rolling_mean,
-            'lower': rolling_mean - (rolling_std * num_std)
+            'upper': pd.Series(rolling_mean + band, index=prices.index),
+            'middle': pd.Series(rolling_mean, index=prices.index),
+            'lower': pd.Series(rolling_mean - band, index=prices.index)
         }
     
     def calculate_macd(self, prices: pd.Series, fast: int = 12, 
@@ -98,23 +298,24 @@ class TechnicalAnalyzer:
         """
         if len(prices) < slow:
             return {
-                'macd': pd.Series([0] * len(prices), index=prices.index),
-                'signal': pd.Series([0] * len(prices), index=prices.index),
-                'histogram': pd.Series([0] * len(prices), index=prices.index)
+                'macd': pd.Series(0, index=prices.index),
+                'signal': pd.Series(0, index=prices.index),
+                'histogram': pd.Series(0, index=prices.index)
             }
         
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal).mean()
-        histogram = macd_line - signal_line
+        # EWMs run in pandas' C kernels on an index-free Series; the arithmetic stays
+        # in NumPy and the results are wrapped on the caller's index only once
+        values = pd.Series(prices.to_numpy(dtype=np.float64))
+        macd_line = (values.ewm(span=fast).mean() - values.ewm(span=slow).mean()).to_numpy()
+        signal_line = pd.Series(macd_line).ewm(span=signal).mean().to_numpy()
         
         return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
+            'macd': pd.Series(macd_line, index=prices.index),
+            'signal': pd.Series(signal_line, index=prices.index),
+            'histogram': pd.Series(macd_line - signal_line, index=prices.index)
         }
     
+    @_cached_on_prices
     def calculate_volatility(self, prices: pd.Series, window: int = 20) -> Dict[str, float]:
         """
         Calculate various volatility measures
@@ -133,13 +334,16 @@ class TechnicalAnalyzer:
                 'rolling_volatility': 0.0
             }
         
-        returns = prices.pct_change().dropna()
+        arr = prices.to_numpy(dtype=np.float64)
+        returns = (arr[1:] - arr[:-1]) / arr[:-1]
+        returns = returns[~np.isnan(returns)]
         
-        daily_vol = returns.std()
+        daily_vol = float(returns.std(ddof=1)) if len(returns) > 1 else np.nan
         annualized_vol = daily_vol * np.sqrt(365)
         
         if len(returns) >= window:
-            rolling_vol = returns.rolling(window=window).std().iloc[-1]
+            # Only the latest window of the rolling std is reported
+            rolling_vol = float(returns[-window:].std(ddof=1))
         else:
             rolling_vol = daily_vol
         
@@ -160,15 +364,15 @@ class TechnicalAnalyzer:
         Returns:
             Dict with momentum percentages
         """
-        momentum = {}
-        current_price = prices.iloc[-1] if len(prices) > 0 else 0
+        arr = prices.to_numpy(dtype=np.float64)
+        momentum = {f'momentum_{period}d': 0.0 for period in periods}
         
-        for period in periods:
-            if len(prices) > period:
-                past_price = prices.iloc[-(period + 1)]
-                momentum[f'momentum_{period}d'] = ((current_price - past_price) / past_price) * 100
-            else:
-                momentum[f'momentum_{period}d'] = 0.0
+        # Gather every past price in one indexing operation
+        available = [period for period in periods if len(arr) > period]
+        if available:
+            past = arr[-(np.array(available) + 1)]
+            changes = (arr[-1] - past) / past * 100
+            momentum.update(zip((f'momentum_{period}d' for period in available), changes.tolist()))
         
         return momentum
     
@@ -183,27 +387,47 @@ class TechnicalAnalyzer:
         Returns:
             Dict with support and resistance levels
         """
-        if len(prices) < window:
-            price_mean = prices.mean()
-            price_std = prices.std() if len(prices) > 1 else 0
+        arr = prices.to_numpy(dtype=np.float64)
+        if len(arr) < window:
+            price_mean, price_std = _nan_mean_std(arr)
+            price_std = price_std if len(arr) > 1 else 0
             return {
                 'support': price_mean - price_std,
                 'resistance': price_mean + price_std,
-                'current_level': prices.iloc[-1] if len(prices) > 0 else price_mean
+                'current_level': arr[-1] if len(arr) > 0 else price_mean
             }
         
-        # Find local minima and maxima
-        rolling_min = prices.rolling(window=window, center=True).min()
-        rolling_max = prices.rolling(window=window, center=True).max()
+        # Recent support/resistance are the extremes of the centered rolling min/max over
+        # the last `window` labels. The complete centered windows behind those labels
+        # together span exactly this tail of the series, so reduce it directly.
+        offset = (window - 1) // 2
+        tail = arr[max(0, len(arr) - 2 * window + offset + 1):]
         
-        # Get recent support/resistance levels
-        recent_support = rolling_min.tail(window).min()
-        recent_resistance = rolling_max.tail(window).max()
+        return {
+            'support': float(np.nanmin(tail)),
+            'resistance': float(np.nanmax(tail)),
+            'current_level': arr[-1]
+        }
+    
+    @_cached_on_prices
+    def compute_all(self, prices: pd.Series) -> Dict:
+        """
+        Calculate the full indicator set for one price Series
         
+        Args:
+            prices: Series of prices
+            
+        Returns:
+            Dict with 'rsi', 'moving_averages', 'bollinger', 'macd' and 'volatility'
+        """
+        # Each indicator is a single vectorized pass; the memo means generate_trading_signals,
+        # a dashboard and the sizing helpers asking about the same Series share these results
         return {
-            'support': recent_support,
-            'resistance': recent_resistance,
-            'current_level': prices.iloc[-1]
+            'rsi': self.calculate_rsi(prices),
+            'moving_averages': self.calculate_moving_averages(prices),
+            'bollinger': self.calculate_bollinger_bands(prices),
+            'macd': self.calculate_macd(prices),
+            'volatility': self.calculate_volatility(prices)
         }
     
     def generate_trading_signals(self, prices: pd.Series) -> Dict[str, str]:
@@ -223,45 +447,46 @@ class TechnicalAnalyzer:
                 'reason': 'Insufficient data for analysis'
             }
         
-        signals = []
+        buy_reasons = []
+        sell_reasons = []
+        # Signals read the latest values of the shared indicator pass, so they agree
+        # with the charted series
+        indicators = self.compute_all(prices)
         
         # RSI signal
-        rsi = self.calculate_rsi(prices)
-        current_rsi = rsi.iloc[-1]
+        current_rsi = indicators['rsi'].iat[-1]
         if current_rsi > 70:
-            signals.append(('SELL', 'RSI overbought'))
+            sell_reasons.append('RSI overbought')
         elif current_rsi < 30:
-            signals.append(('BUY', 'RSI oversold'))
+            buy_reasons.append('RSI oversold')
         
         # Moving average signal
-        ma_short = prices.rolling(window=5).mean().iloc[-1]
-        ma_long = prices.rolling(window=20).mean().iloc[-1]
-        current_price = prices.iloc[-1]
+        ma_short = indicators['moving_averages']['MA_5'].iat[-1]
+        ma_long = indicators['moving_averages']['MA_20'].iat[-1]
+        current_price = prices.to_numpy(dtype=np.float64)[-1]
         
         if ma_short > ma_long and current_price > ma_short:
-            signals.append(('BUY', 'Price above rising MA'))
+            buy_reasons.append('Price above rising MA')
         elif ma_short < ma_long and current_price < ma_short:
-            signals.append(('SELL', 'Price below falling MA'))
+            sell_reasons.append('Price below falling MA')
         
         # Bollinger Bands signal
-        bb = self.calculate_bollinger_bands(prices)
-        if current_price > bb['upper'].iloc[-1]:
-            signals.append(('SELL', 'Price above upper Bollinger Band'))
-        elif current_price < bb['lower'].iloc[-1]:
-            signals.append(('BUY', 'Price below lower Bollinger Band'))
+        bb_upper = indicators['bollinger']['upper'].iat[-1]
+        bb_lower = indicators['bollinger']['lower'].iat[-1]
+        if current_price > bb_upper:
+            sell_reasons.append('Price above upper Bollinger Band')
+        elif current_price < bb_lower:
+            buy_reasons.append('Price below lower Bollinger Band')
         
         # Aggregate signals
-        buy_signals = [s for s in signals if s[0] == 'BUY']
-        sell_signals = [s for s in signals if s[0] == 'SELL']
-        
-        if len(buy_signals) > len(sell_signals):
+        if len(buy_reasons) > len(sell_reasons):
             signal = 'BUY'
-            strength = 'STRONG' if len(buy_signals) >= 2 else 'MODERATE'
-            reason = '; '.join([s[1] for s in buy_signals])
-        elif len(sell_signals) > len(buy_signals):
+            strength = 'STRONG' if len(buy_reasons) >= 2 else 'MODERATE'
+            reason = '; '.join(buy_reasons)
+        elif len(sell_reasons) > len(buy_reasons):
             signal = 'SELL'
-            strength = 'STRONG' if len(sell_signals) >= 2 else 'MODERATE'
-            reason = '; '.join([s[1] for s in sell_signals])
+            strength = 'STRONG' if len(sell_reasons) >= 2 else 'MODERATE'
+            reason = '; '.join(sell_reasons)
         else:
             signal = 'HOLD'
             strength = 'NEUTRAL'
@@ -300,17 +525,17 @@ class TechnicalAnalyzer:
         # Calculate position size based on volatility
         # Higher volatility = smaller position size
         vol_adjustment = 1 / (1 + daily_vol * 10)  # Scale factor
+        base = available_balance * vol_adjustment
         
-        base_conservative = available_balance * 0.1 * vol_adjustment
-        base_moderate = available_balance * 0.2 * vol_adjustment
-        base_aggressive = available_balance * 0.3 * vol_adjustment
-        
-        # Apply risk management
+        # Apply risk management; the three caps share one risk-per-unit-move term
         max_risk_amount = available_balance * risk_tolerance
-        current_price = prices.iloc[-1]
+        current_price = prices.to_numpy(dtype=np.float64)[-1]
+        vol_price = daily_vol * current_price
+        # Zero measured volatility means the risk cap never binds
+        risk_cap = max_risk_amount / vol_price if vol_price else float('inf')
         
         return {
-            'conservative': min(base_conservative, max_risk_amount / (daily_vol * current_price)),
-            'moderate': min(base_moderate, max_risk_amount / (daily_vol * current_price * 0.8)),
-            'aggressive': min(base_aggressive, max_risk_amount / (daily_vol * current_price * 0.6))
+            'conservative': min(base * 0.1, risk_cap),
+            'moderate': min(base * 0.2, risk_cap / 0.8),
+            'aggressive': min(base * 0.3, risk_cap / 0.6)
         }
\ No newline at end of file